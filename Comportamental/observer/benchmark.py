@@ -0,0 +1,158 @@
+"""
+Benchmarks das variações do padrão Observer.
+
+Uso:
+    python benchmark.py            # roda todos
+    python benchmark.py async      # roda apenas um deles
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+from time import perf_counter, sleep
+from typing import Callable, Dict, List, Optional
+
+from observer_1 import IObserver, ThreadPoolDelivery, WeatherStation
+from observer_2 import AsyncWeatherStation, IAsyncObserver
+from observer_registry import ObserverRegistry
+
+
+class QuietObserver(IObserver):
+    # observer sem print, que pode ser lento
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.updates = 0
+        self.last_state: Optional[Dict] = None
+
+    def update(self, state: Optional[Dict] = None) -> None:
+        if self.delay:
+            sleep(self.delay)
+        self.updates += 1
+        self.last_state = state
+
+
+class AsyncQuietObserver(IAsyncObserver):
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.updates = 0
+
+    async def update(self) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.updates += 1
+
+
+def bench_async(
+    observers: int = 1000, slow: int = 10, delay: float = 0.05,
+    updates: int = 5,
+) -> None:
+    # latência de cada atualização com alguns observers lentos
+    station = WeatherStation()
+    # a estação só guarda referências fracas
+    quiet = [QuietObserver(delay if i < slow else 0) for i in range(observers)]
+    for observer in quiet:
+        station.add_observer(observer)
+
+    start = perf_counter()
+    for update in range(updates):
+        station.state = {'temperature': str(update)}
+    sync_time = (perf_counter() - start) / updates
+
+    async def run() -> float:
+        async_station = AsyncWeatherStation(timeout=delay / 2)
+        for i in range(observers):
+            async_station.add_observer(
+                AsyncQuietObserver(delay if i < slow else 0))
+
+        start = perf_counter()
+        for update in range(updates):
+            await async_station.update_state({'temperature': str(update)})
+        return (perf_counter() - start) / updates
+
+    async_time = asyncio.run(run())
+
+    print(f'observers: {observers} ({slow} lentos, {delay * 1000:.0f}ms)')
+    print(f'WeatherStation:       {sync_time * 1000:8.1f}ms por atualização')
+    print(f'AsyncWeatherStation:  {async_time * 1000:8.1f}ms por atualização'
+          f' (timeout {delay / 2 * 1000:.0f}ms)')
+
+
+def bench_threads(observers: int = 100, delay: float = 0.05,
+                  updates: int = 100) -> None:
+    # tempo do produtor com um observer lento, por política de overflow
+    print(f'observers: {observers} (1 lento, {delay * 1000:.0f}ms), '
+          f'atualizações: {updates}')
+
+    for overflow in ThreadPoolDelivery.OVERFLOW_POLICIES:
+        delivery = ThreadPoolDelivery(
+            max_workers=8, queue_size=16, overflow=overflow)
+        station = WeatherStation(delivery)
+        slow = QuietObserver(delay)
+        quiet = [slow, *(QuietObserver() for _ in range(observers - 1))]
+        for observer in quiet:
+            station.add_observer(observer)
+
+        start = perf_counter()
+        for update in range(updates):
+            station.state = {'temperature': str(update)}
+        producer_time = perf_counter() - start
+        stats = delivery.stats()
+        delivery.shutdown()
+
+        print(f'{overflow:<12} produtor: {producer_time * 1000:8.1f}ms '
+              f'fila: {stats["queued"]:4} descartes: {stats["drops"]:4} '
+              f'entregues ao lento: {slow.updates} '
+              f'(último: {slow.last_state["temperature"]})')
+
+
+def bench_registry(observers: int = 20_000) -> None:
+    # cadastrar e descadastrar todos: lista x registro com weakref
+    quiet = [QuietObserver() for _ in range(observers)]
+    leaving = quiet[:]
+    random.Random(42).shuffle(leaving)  # descadastros fora de ordem
+    print(f'observers: {observers}')
+
+    list_observers: List[IObserver] = []
+    start = perf_counter()
+    for observer in quiet:
+        list_observers.append(observer)
+    for observer in leaving:
+        if observer in list_observers:
+            list_observers.remove(observer)
+    list_time = perf_counter() - start
+
+    registry: ObserverRegistry[IObserver] = ObserverRegistry()
+    start = perf_counter()
+    for observer in quiet:
+        registry.add(observer)
+    for observer in leaving:
+        if observer in registry:
+            registry.discard(observer)
+    registry_time = perf_counter() - start
+
+    # observers que não se descadastraram somem do registro sozinhos
+    for observer in quiet:
+        registry.add(observer)
+    del observer
+    quiet.clear()
+    leaving.clear()
+
+    print(f'lista:     {list_time * 1000:10.1f}ms')
+    print(f'registro:  {registry_time * 1000:10.1f}ms '
+          f'(restantes após o gc: {len(registry)})')
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    'async': bench_async,
+    'threads': bench_threads,
+    'registry': bench_registry,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f'--- {name} ---')
+        BENCHMARKS[name]()
@@ -12,7 +12,12 @@ que gera as informações.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition
+from typing import Deque, Dict, Optional
+
+from observer_registry import ObserverRegistry
 
 
 class IObservable(ABC):
@@ -35,10 +40,16 @@ class IObservable(ABC):
 class WeatherStation(IObservable):
     # Observable
 
-    def __init__(self) -> None:
-        self._observers: List[IObserver] = []
+    def __init__(self, delivery: Optional[ThreadPoolDelivery] = None) -> None:
+        # referências fracas: um observer que não se descadastrou não fica
+        # vivo só por causa da estação
+        self._observers: ObserverRegistry[IObserver] = ObserverRegistry()
         self._state: Dict = {}
 
+        # sem delivery, os observers são chamados na thread de quem
+        # alterou o estado (comportamento original)
+        self.delivery = delivery
+
     @property
     def state(self):
         return self._state
@@ -56,22 +67,132 @@ class WeatherStation(IObservable):
         self.notify_observers()
 
     def add_observer(self, observer: IObserver) -> None:
-        self._observers.append(observer)
+        self._observers.add(observer)
 
     def remove_observer(self, observer: IObserver) -> None:
         if observer not in self._observers:
             return
 
-        self._observers.remove(observer)
+        self._observers.discard(observer)
+
+        if self.delivery is not None:
+            self.delivery.discard(observer)
 
     def notify_observers(self) -> None:
+        if self.delivery is not None:
+            for observer in self._observers:
+                self.delivery.deliver(observer, self._state)
+            return
+
         for observer in self._observers:
             observer.update()
 
 
+class ThreadPoolDelivery:
+    # Entrega as notificações num pool de threads. Cada observer tem a sua
+    # fila limitada (queue_size) de estados e recebe, em ordem e um de
+    # cada vez, o estado de cada notificação em update(state), e não o
+    # estado atual da estação. Quando a fila de um observer lento enche,
+    # overflow decide:
+    # - 'block': quem alterou o estado espera abrir espaço na fila;
+    # - 'drop_oldest': descarta a notificação mais antiga;
+    # - 'coalesce': a última notificação da fila é trocada pela nova.
+    OVERFLOW_POLICIES = ('block', 'drop_oldest', 'coalesce')
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        queue_size: int = 16,
+        overflow: str = 'drop_oldest',
+    ) -> None:
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f'overflow deve ser um de '
+                             f'{self.OVERFLOW_POLICIES}, não {overflow!r}')
+
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.drops = 0
+        self.failures = 0
+
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._queues: Dict[IObserver, Deque[Dict]] = {}
+        self._scheduled: Dict[IObserver, bool] = {}
+        self._condition = Condition()
+
+    def deliver(self, observer: IObserver, state: Dict) -> None:
+        with self._condition:
+            queue = self._queues.setdefault(observer, deque())
+
+            if len(queue) >= self.queue_size:
+                if self.overflow == 'block':
+                    self._condition.wait_for(
+                        lambda: self._queues.get(observer) is not queue
+                        or len(queue) < self.queue_size)
+
+                    if self._queues.get(observer) is not queue:
+                        return  # o observer foi removido enquanto esperava
+                elif self.overflow == 'drop_oldest':
+                    queue.popleft()
+                    self.drops += 1
+                else:
+                    queue.pop()
+                    self.drops += 1
+
+            queue.append(state)
+
+            if not self._scheduled.get(observer):
+                self._scheduled[observer] = True
+                self._executor.submit(self._drain, observer)
+
+    def _drain(self, observer: IObserver) -> None:
+        # só uma thread por observer: as notificações chegam em ordem
+        while True:
+            with self._condition:
+                queue = self._queues.get(observer)
+
+                if not queue:
+                    # sem filas vazias guardadas, o pool não segura
+                    # referências para observers parados
+                    self._queues.pop(observer, None)
+                    self._scheduled.pop(observer, None)
+                    return
+
+                state = queue.popleft()
+                self._condition.notify_all()
+
+            try:
+                observer.update(state)
+            except Exception:
+                # um observer com erro não derruba o pool; só é contado
+                with self._condition:
+                    self.failures += 1
+
+    def discard(self, observer: IObserver) -> None:
+        with self._condition:
+            self._queues.pop(observer, None)
+            self._condition.notify_all()
+
+    def queue_depth(self, observer: IObserver) -> int:
+        with self._condition:
+            return len(self._queues.get(observer, ()))
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                'queued': sum(map(len, self._queues.values())),
+                'drops': self.drops,
+                'failures': self.failures,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait)
+
+
 class IObserver(ABC):
+    # state: o estado no momento da notificação, quando a entrega não é
+    # imediata (ThreadPoolDelivery); sem ele, o observer lê o estado atual
     @abstractmethod
-    def update(self) -> None: pass
+    def update(self, state: Optional[Dict] = None) -> None: pass
 
 
 class Smartphone(IObserver):
@@ -79,10 +200,13 @@ class Smartphone(IObserver):
         self.name = name
         self.observable = observable
 
-    def update(self) -> None:
+    def update(self, state: Optional[Dict] = None) -> None:
+        if state is None:
+            state = self.observable.state
+
         observable_name = self.observable.__class__.__name__
         print(f'{self.name}. O objeto {observable_name} '
-              f'acabou de ser atualizado => {self.observable.state}\n')
+              f'acabou de ser atualizado => {state}\n')
 
 
 if __name__ == '__main__':
@@ -99,3 +223,14 @@ if __name__ == '__main__':
 
     weather_station.remove_observer(smartphone)
     weather_station.reset_state()
+
+    # entrega em threads: o setter do estado não espera os observers
+    delivery = ThreadPoolDelivery(overflow='coalesce')
+    threaded_station = WeatherStation(delivery)
+    # a estação guarda só referências fracas: o observer precisa de uma
+    # referência forte enquanto estiver cadastrado
+    thread_smartphone = Smartphone("thread", threaded_station)
+    threaded_station.add_observer(thread_smartphone)
+    threaded_station.state = {"temperature": "25"}
+    threaded_station.state = {"temperature": "26"}
+    delivery.shutdown()
@@ -0,0 +1,122 @@
+"""
+Observer assíncrono.
+
+No observer_1.py, notify_observers chama observer.update() de um em um,
+na mesma thread de quem alterou o estado. Um único observer lento
+atrasa a atualização e todos os outros observers.
+
+Aqui o observable usa asyncio: notify_observers dispara o update de
+todos os observers ao mesmo tempo com asyncio.gather. Cada observer
+tem um tempo máximo para responder (timeout) e uma falha ou demora em
+um deles não afeta os demais; elas só são contadas.
+"""
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+class IAsyncObservable(ABC):
+    # Observable
+
+    @property
+    @abstractmethod
+    def state(self) -> Dict: pass
+
+    @abstractmethod
+    def add_observer(self, observer: IAsyncObserver) -> None: pass
+
+    @abstractmethod
+    def remove_observer(self, observer: IAsyncObserver) -> None: pass
+
+    @abstractmethod
+    async def notify_observers(self) -> None: pass
+
+
+class AsyncWeatherStation(IAsyncObservable):
+    # Observable
+
+    def __init__(self, timeout: Optional[float] = 1) -> None:
+        self._observers: List[IAsyncObserver] = []
+        self._state: Dict = {}
+
+        self.timeout = timeout
+        self.timeouts = 0
+        self.failures = 0
+
+    @property
+    def state(self) -> Dict:
+        return self._state
+
+    async def update_state(self, state_update: Dict) -> None:
+        # property setters não podem ser async
+        new_state: Dict = {**self._state, **state_update}
+
+        if new_state != self._state:
+            self._state = new_state
+            await self.notify_observers()
+
+    async def reset_state(self) -> None:
+        self._state = {}
+        await self.notify_observers()
+
+    def add_observer(self, observer: IAsyncObserver) -> None:
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: IAsyncObserver) -> None:
+        if observer not in self._observers:
+            return
+
+        self._observers.remove(observer)
+
+    async def notify_observers(self) -> None:
+        await asyncio.gather(*(
+            self._notify(observer) for observer in list(self._observers)
+        ))
+
+    async def _notify(self, observer: IAsyncObserver) -> None:
+        try:
+            await asyncio.wait_for(observer.update(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+        except Exception:
+            self.failures += 1
+
+
+class IAsyncObserver(ABC):
+    @abstractmethod
+    async def update(self) -> None: pass
+
+
+class AsyncSmartphone(IAsyncObserver):
+    def __init__(
+        self, name, observable: IAsyncObservable, delay: float = 0
+    ) -> None:
+        self.name = name
+        self.observable = observable
+        self.delay = delay  # simulando um observer lento
+
+    async def update(self) -> None:
+        await asyncio.sleep(self.delay)
+        observable_name = self.observable.__class__.__name__
+        print(f'{self.name}. O objeto {observable_name} '
+              f'acabou de ser atualizado => {self.observable.state}\n')
+
+
+if __name__ == '__main__':
+    async def main() -> None:
+        weather_station = AsyncWeatherStation(timeout=0.5)
+
+        smartphone = AsyncSmartphone("samsung", weather_station)
+        lento = AsyncSmartphone("lento", weather_station, delay=10)
+
+        weather_station.add_observer(smartphone)
+        weather_station.add_observer(lento)
+
+        # o smartphone lento não segura a atualização por 10 segundos
+        await weather_station.update_state({"temperature": "30"})
+        await weather_station.update_state({"time": "13:49"})
+        print(f'timeouts: {weather_station.timeouts}')
+
+    asyncio.run(main())
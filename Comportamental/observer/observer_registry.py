@@ -0,0 +1,81 @@
+"""
+Registro de observers com referências fracas.
+
+O WeatherStation guardava os observers numa lista: remove_observer
+percorria a lista duas vezes (o `in` e o remove) e a estação mantinha
+vivo todo observer que esquecesse de se descadastrar.
+
+ObserverRegistry guarda os observers num dict indexado pelo id() de
+cada um, com um weakref.ref como valor:
+
+- add e discard são O(1) e a ordem de cadastro é mantida (dict);
+- quando um observer deixa de existir em outro lugar do programa, o
+callback do weakref o remove do registro automaticamente.
+
+É usado pelo observer_1.py e pelo facade/facade_1.py.
+"""
+from __future__ import annotations
+
+import weakref
+from typing import Dict, Generic, Iterator, TypeVar
+
+T = TypeVar('T')
+
+
+class ObserverRegistry(Generic[T]):
+    def __init__(self) -> None:
+        self._refs: Dict[int, weakref.ref] = {}
+
+    def add(self, observer: T) -> None:
+        key = id(observer)
+
+        if key in self._refs and self._refs[key]() is observer:
+            return
+
+        def forget(ref: weakref.ref, key: int = key) -> None:
+            # o id pode ser reaproveitado por outro observer: só remove
+            # se a entrada ainda for deste weakref
+            if self._refs.get(key) is ref:
+                del self._refs[key]
+
+        self._refs[key] = weakref.ref(observer, forget)
+
+    def discard(self, observer: T) -> None:
+        key = id(observer)
+        ref = self._refs.get(key)
+
+        if ref is not None and ref() is observer:
+            del self._refs[key]
+
+    def __contains__(self, observer: object) -> bool:
+        ref = self._refs.get(id(observer))
+        return ref is not None and ref() is observer
+
+    def __iter__(self) -> Iterator[T]:
+        # percorre uma cópia: um observer coletado durante a notificação
+        # remove a sua entrada do dict original
+        for ref in self._refs.copy().values():
+            observer = ref()
+
+            if observer is not None:
+                yield observer
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+
+if __name__ == '__main__':
+    class Observer:
+        def __init__(self, name: str) -> None:
+            self.name = name
+
+    registry: ObserverRegistry[Observer] = ObserverRegistry()
+    primeiro, segundo = Observer('primeiro'), Observer('segundo')
+    registry.add(primeiro)
+    registry.add(segundo)
+    registry.add(Observer('sem referência'))  # coletado na hora
+
+    print([observer.name for observer in registry])
+
+    del segundo
+    print([observer.name for observer in registry], len(registry))
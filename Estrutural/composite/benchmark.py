@@ -0,0 +1,276 @@
+"""
+Benchmarks das variações do padrão Composite.
+
+Uso:
+    python benchmark.py              # roda todos
+    python benchmark.py traversal    # roda apenas um deles
+    LEAVES=100000 python benchmark.py  # muda a escala (padrão 1M folhas)
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from composite_1 import Box, BoxStructure, Product, parallel_price
+from composite_2 import CompiledTree, np
+from composite_3 import MappedTree, dump
+
+LEAVES = int(os.environ.get('LEAVES', 1_000_000))
+
+
+def build_deep_tree(depth: int) -> Box:
+    # uma caixa dentro da outra, com um produto em cada nível
+    root = box = Box('caixa 0')
+
+    for level in range(1, depth):
+        box.add(Product(f'produto {level}', 1))
+        inner = Box(f'caixa {level}')
+        box.add(inner)
+        box = inner
+
+    return root
+
+
+def build_wide_tree(leaves: int, per_box: int = 1000) -> Box:
+    # caixa grande > caixas com `per_box` produtos cada
+    root = Box('caixa grande')
+
+    for start in range(0, leaves, per_box):
+        box = Box(f'caixa {start // per_box}')
+        for i in range(start, min(start + per_box, leaves)):
+            box.add(Product(f'produto {i}', i % 100 + 0.99))
+        root.add(box)
+
+    return root
+
+
+def measure(build: Callable[[], object]) -> Tuple[object, int]:
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def recursive_price(node: BoxStructure) -> float:
+    # a versão recursiva original de Box.get_price
+    if isinstance(node, Product):
+        return node.price
+
+    return sum([recursive_price(child) for child in node.children()])
+
+
+def recursive_leaves(node: BoxStructure) -> List[Product]:
+    if isinstance(node, Product):
+        return [node]
+
+    leaves: List[Product] = []
+    for child in node.children():
+        leaves.extend(recursive_leaves(child))
+    return leaves
+
+
+def bench_traversal(depth: int = 10_000, repeat: int = 20) -> None:
+    # recursão x pilha explícita em árvores profundas
+    for current_depth in (300, depth):
+        tree = build_deep_tree(current_depth)
+        print(f'profundidade: {current_depth}')
+
+        for name, walk in (
+            ('recursive_price', lambda: recursive_price(tree)),
+            ('recursive_leaves', lambda: len(recursive_leaves(tree))),
+            ('compute_price', tree.compute_price),
+            ('iter_leaves', lambda: sum(1 for _ in tree.iter_leaves())),
+            ('iter_breadth_first',
+             lambda: sum(1 for _ in tree.iter_breadth_first())),
+        ):
+            try:
+                start = perf_counter()
+                for _ in range(repeat):
+                    walk()
+                elapsed = (perf_counter() - start) / repeat
+                print(f'  {name:<20} {elapsed * 1000:8.2f}ms')
+            except RecursionError:
+                print(f'  {name:<20} RecursionError')
+
+
+def bench_compiled(leaves: int = LEAVES) -> None:
+    # árvore de objetos x árvore compilada em arrays
+    tree, tree_memory = measure(lambda: build_wide_tree(leaves))
+    assert isinstance(tree, Box)
+    compiled, compiled_memory = measure(lambda: CompiledTree.from_tree(tree))
+    assert isinstance(compiled, CompiledTree)
+
+    print(f'folhas: {leaves} (NumPy: {"sim" if np is not None else "não"})')
+    print(f'memória objetos:   {tree_memory / 2 ** 20:8.1f} MiB')
+    print(f'memória compilada: {compiled_memory / 2 ** 20:8.1f} MiB')
+
+    start = perf_counter()
+    object_totals = [box.compute_price() for box in tree.iter_boxes()]
+    print(f'totais (objetos):  {perf_counter() - start:8.3f}s')
+
+    start = perf_counter()
+    compiled_totals = compiled.subtree_totals()
+    print(f'totais (exatos):   {perf_counter() - start:8.3f}s')
+
+    start = perf_counter()
+    prefix_totals = compiled.subtree_totals(exact=False)
+    print(f'totais (prefixo):  {perf_counter() - start:8.3f}s')
+
+    # os totais exatos batem com get_price; os da soma de prefixos, não
+    box_totals = [
+        total for total, leaf in zip(compiled_totals, compiled.leaves)
+        if not leaf
+    ]
+    assert box_totals == [box.get_price() for box in tree.iter_boxes()]
+    assert object_totals[0] == compiled_totals[0]
+    error = max(
+        abs(prefix - total)
+        for prefix, total in zip(prefix_totals, compiled_totals))
+    print(f'maior erro da soma de prefixos: {error:.3g}')
+
+    start = perf_counter()
+    compiled.to_tree()
+    print(f'to_tree:           {perf_counter() - start:8.3f}s')
+
+
+def bench_mutation(children: int = 20_000) -> None:
+    # esvaziar uma caixa grande: lista (original) x dict x lote, com os
+    # filhos removidos fora de ordem (no início da lista, `in` e remove
+    # achariam cada item na primeira posição)
+    products = [Product(f'produto {i}', 1) for i in range(children)]
+    leaving = products[:]
+    random.Random(42).shuffle(leaving)
+    print(f'filhos: {children}')
+
+    def report(name: str, elapsed: float) -> None:
+        print(f'{name:<22} {elapsed:8.3f}s '
+              f'({elapsed / children * 1e6:6.1f}µs por filho)')
+
+    as_list = list(products)
+    start = perf_counter()
+    for product in leaving:
+        if product in as_list:
+            as_list.remove(product)
+    report('list.remove', perf_counter() - start)
+
+    box = Box('caixa')
+    box.extend(products)
+    start = perf_counter()
+    for product in leaving:
+        box.remove(product)
+    report('Box.remove um a um', perf_counter() - start)
+
+    box.extend(products)
+    start = perf_counter()
+    box.remove_many(leaving)
+    report('Box.remove_many', perf_counter() - start)
+
+    print('(Box.remove: a maior parte do custo é a aritmética com '
+          'Fraction dos subtotais exatos)')
+
+
+def bench_parallel(leaves: int = LEAVES) -> None:
+    # escalabilidade de parallel_price de 1 até N núcleos
+    tree = build_wide_tree(leaves)
+    cores = os.cpu_count() or 1
+    print(f'folhas: {leaves}, núcleos: {cores}')
+
+    start = perf_counter()
+    expected = tree.compute_price()
+    base = perf_counter() - start
+    print(f'compute_price:      {base:8.3f}s')
+
+    workers = 1
+    while True:
+        start = perf_counter()
+        total = parallel_price(tree, workers)
+        elapsed = perf_counter() - start
+        assert abs(total - expected) < 1e-6 * leaves
+        print(f'parallel_price({workers:>2}): {elapsed:8.3f}s '
+              f'({base / elapsed:.2f}x)')
+
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
+
+
+def to_json(node: BoxStructure) -> Any:
+    if isinstance(node, Product):
+        return {'name': node.name, 'price': node.price}
+
+    return {
+        'name': node.name,
+        'children': [to_json(child) for child in node.children()],
+    }
+
+
+def from_json(data: Any) -> BoxStructure:
+    if 'price' in data:
+        return Product(data['name'], data['price'])
+
+    box = Box(data['name'])
+    box.extend(from_json(child) for child in data['children'])
+    return box
+
+
+def bench_mmap(leaves: int = LEAVES) -> None:
+    # startup: JSON + objetos x arquivo binário com mmap
+    tree = build_wide_tree(leaves)
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'tree.json')
+        binary_path = os.path.join(directory, 'tree.bin')
+
+        with open(json_path, 'w') as file:
+            json.dump(to_json(tree), file)
+
+        with open(binary_path, 'wb') as file:
+            dump(tree, file)
+
+        print(f'folhas: {leaves}')
+        for name, path in (('JSON', json_path), ('binário', binary_path)):
+            size = os.path.getsize(path) / 2 ** 20
+            print(f'tamanho {name + ":":<9} {size:8.1f} MiB')
+
+        start = perf_counter()
+        with open(json_path) as file:
+            loaded = from_json(json.load(file))
+        price = loaded.get_price()
+        print(f'JSON: carregar + preço total:       '
+              f'{perf_counter() - start:8.3f}s')
+
+        start = perf_counter()
+        with MappedTree(binary_path) as mapped:
+            root = mapped.root
+            mapped_price = root.get_price()
+            # visita só a primeira caixa
+            first_box = next(iter(root.children()))
+            sum(1 for _ in first_box.children())
+            print(f'mmap: abrir + preço + uma caixa:    '
+                  f'{perf_counter() - start:8.3f}s')
+
+        assert abs(price - mapped_price) < 1e-6 * leaves
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    'traversal': bench_traversal,
+    'compiled': bench_compiled,
+    'mutation': bench_mutation,
+    'parallel': bench_parallel,
+    'mmap': bench_mmap,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f'--- {name} ---')
+        BENCHMARKS[name]()
@@ -21,12 +21,24 @@ real da aplicação.
 """
 from __future__ import annotations
 
+import os
 from abc import ABC, abstractmethod
-from typing import List
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from math import fsum
+from multiprocessing import get_all_start_methods, get_context
+from operator import itemgetter
+from typing import (Dict, Iterable, Iterator, KeysView, List, Optional,
+                    Tuple)
 
 
 class BoxStructure(ABC):
     # Componente
+    name: str
+    parent: Optional[Box] = None
+
     @abstractmethod
     def print_content(self) -> None: pass
 
@@ -37,38 +49,220 @@ class BoxStructure(ABC):
 
     def remove(self, child: BoxStructure) -> None: pass
 
+    def compute_price(self) -> float:
+        return self.get_price()
+
+    def _exact_price(self) -> Fraction:
+        return Fraction(self.get_price())
+
+    def children(self) -> KeysView[BoxStructure]:
+        return _NO_CHILDREN.keys()
+
+    # percursos com pilha/fila explícitas: sem recursão, então árvores
+    # muito profundas não estouram o limite de recursão do Python
+
+    def iter_depth_first(self) -> Iterator[BoxStructure]:
+        stack: List[BoxStructure] = [self]
+
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children()))
+
+    def iter_breadth_first(self) -> Iterator[BoxStructure]:
+        queue = deque([self])
+
+        while queue:
+            node = queue.popleft()
+            yield node
+            queue.extend(node.children())
+
+    def iter_leaves(self) -> Iterator[Product]:
+        for node in self.iter_depth_first():
+            if isinstance(node, Product):
+                yield node
+
+    def iter_boxes(self) -> Iterator[Box]:
+        for node in self.iter_depth_first():
+            if isinstance(node, Box):
+                yield node
+
+
+_NO_CHILDREN: Dict[BoxStructure, None] = {}
+
 
 class Box(BoxStructure):
     # Composite
+    # índice opcional da subárvore (veja create_index)
+    index: Optional[TreeIndex] = None
+
     def __init__(self, name) -> None:
         self.name = name
-        self._children: List[BoxStructure] = []
+
+        # dict como conjunto ordenado: mantém a ordem de inserção e
+        # remove um filho em O(1)
+        self._children: Dict[BoxStructure, None] = {}
+
+        # soma dos filhos, mantida a cada alteração na árvore. Fraction
+        # soma os floats sem arredondar, então somar e subtrair deltas
+        # milhares de vezes não acumula erro
+        self._subtotal = Fraction(0)
 
     def print_content(self) -> None:
-        print(f'\n{self.name}:')
-        for child in self._children:
-            child.print_content()
+        for node in self.iter_depth_first():
+            if isinstance(node, Box):
+                print(f'\n{node.name}:')
+            else:
+                node.print_content()
 
     def get_price(self) -> float:
-        return sum([
-            child.get_price() for child in self._children
-        ])
+        return float(self._subtotal)
+
+    def _exact_price(self) -> Fraction:
+        return self._subtotal
+
+    def compute_price(self) -> float:
+        # recalcula a soma a partir das folhas, sem usar o cache. fsum
+        # arredonda a soma exata, assim como get_price
+        return fsum(leaf.price for leaf in self.iter_leaves())
+
+    def children(self) -> KeysView[BoxStructure]:
+        return self._children.keys()
 
     def add(self, child: BoxStructure) -> None:
-        self._children.append(child)
+        self.extend([child])
 
     def remove(self, child: BoxStructure) -> None:
-        if child not in self._children:
+        self.remove_many([child])
+
+    # operações em lote: o subtotal dos ancestrais é atualizado uma
+    # única vez por lote, e não uma vez por filho
+
+    def extend(self, children: Iterable[BoxStructure]) -> None:
+        children = list(children)
+        self._check_cycles(children)
+        previous_parents: Dict[Box, List[BoxStructure]] = {}
+
+        for child in children:
+            if child.parent is not None and child.parent is not self:
+                previous_parents.setdefault(child.parent, []).append(child)
+
+        for parent, moved in previous_parents.items():
+            parent.remove_many(moved)
+
+        delta = Fraction(0)
+        added: List[BoxStructure] = []
+
+        for child in children:
+            if child.parent is self:
+                continue
+
+            self._children[child] = None
+            child.parent = self
+            delta += child._exact_price()
+            added.append(child)
+
+        self._adjust_price(delta)
+
+        for index in self._indexes():
+            index.add_subtrees(added)
+
+    def remove_many(self, children: Iterable[BoxStructure]) -> None:
+        delta = Fraction(0)
+        removed: List[BoxStructure] = []
+
+        for child in children:
+            if child.parent is not self:
+                continue
+
+            del self._children[child]
+            child.parent = None
+            delta -= child._exact_price()
+            removed.append(child)
+
+        self._adjust_price(delta)
+
+        for index in self._indexes():
+            for child in removed:
+                index.remove_subtree(child)
+
+    def replace(self, children: Iterable[BoxStructure]) -> None:
+        # troca todo o conteúdo da caixa
+        self.remove_many(list(self.children()))
+        self.extend(children)
+
+    def clear(self) -> None:
+        self.remove_many(list(self.children()))
+
+    def _check_cycles(self, children: List[BoxStructure]) -> None:
+        # a caixa e os seus ancestrais não podem virar filhos dela: com
+        # um ciclo de pais, os laços até a raiz nunca terminariam
+        ancestors: Dict[BoxStructure, None] = {}
+        box: Optional[Box] = self
+
+        while box is not None:
+            ancestors[box] = None
+            box = box.parent
+
+        for child in children:
+            if child in ancestors:
+                raise ValueError(
+                    f'{child.name} não pode ser adicionada a {self.name}: '
+                    f'criaria um ciclo')
+
+    def _adjust_price(self, delta: Fraction) -> None:
+        # atualiza só os ancestrais, do nó até a raiz: O(profundidade)
+        if not delta:
             return
 
-        self._children.remove(child)
+        box: Optional[Box] = self
+        while box is not None:
+            box._subtotal += delta
+            box = box.parent
+
+    def _indexes(self) -> List[TreeIndex]:
+        # índices desta caixa e dos seus ancestrais
+        indexes: List[TreeIndex] = []
+        box: Optional[Box] = self
+
+        while box is not None:
+            if box.index is not None:
+                indexes.append(box.index)
+            box = box.parent
+
+        return indexes
+
+    def create_index(self) -> TreeIndex:
+        if self.index is None:
+            self.index = TreeIndex(self)
+
+        return self.index
+
+    def drop_index(self) -> None:
+        self.index = None
 
 
 class Product(BoxStructure):
     # Leaf
     def __init__(self, name: str, price: float) -> None:
         self.name = name
-        self.price = price
+        self._price = price
+
+    @property
+    def price(self) -> float:
+        return self._price
+
+    @price.setter
+    def price(self, price: float) -> None:
+        old_price = self._price
+        self._price = price
+
+        if self.parent is not None:
+            self.parent._adjust_price(
+                Fraction(price) - Fraction(old_price))
+
+            for index in self.parent._indexes():
+                index.update_price(self, old_price)
 
     def print_content(self) -> None:
         print(self.name, self.price)
@@ -77,6 +271,165 @@ class Product(BoxStructure):
         return self.price
 
 
+class TreeIndex:
+    # Índices secundários de uma subárvore, mantidos a cada add/remove
+    # e a cada mudança de preço:
+    # - nome -> produtos (hash);
+    # - produtos ordenados por preço (bisect).
+    def __init__(self, root: Box) -> None:
+        self.root = root
+        self._by_name: Dict[str, Dict[Product, None]] = {}
+        self._prices: List[float] = []
+        self._products: List[Product] = []
+
+        self.add_subtree(root)
+
+    def add_subtree(self, node: BoxStructure) -> None:
+        self.add_subtrees([node])
+
+    def add_subtrees(self, nodes: Iterable[BoxStructure]) -> None:
+        added = [
+            (product.price, product)
+            for node in nodes for product in node.iter_leaves()
+        ]
+
+        for _, product in added:
+            self._by_name.setdefault(product.name, {})[product] = None
+
+        # poucos produtos perto do tamanho do índice: um bisect + insert
+        # por produto sai mais barato que refazer as listas inteiras
+        if len(added) <= len(self._prices) // 8:
+            for _, product in added:
+                self._insert(product)
+            return
+
+        # carga em lote (create_index, extend grande): um único sort em
+        # vez de um list.insert por produto. O Timsort é
+        # estável e aproveita a parte já ordenada, então os produtos com
+        # o mesmo preço continuam depois dos que já estavam no índice
+        merged = list(zip(self._prices, self._products))
+        merged.extend(added)
+        merged.sort(key=itemgetter(0))
+        self._prices = [price for price, _ in merged]
+        self._products = [product for _, product in merged]
+
+    def remove_subtree(self, node: BoxStructure) -> None:
+        for product in node.iter_leaves():
+            self._remove(product, product.price)
+
+    def update_price(self, product: Product, old_price: float) -> None:
+        self._remove(product, old_price)
+        self._add(product)
+
+    def _add(self, product: Product) -> None:
+        self._by_name.setdefault(product.name, {})[product] = None
+        self._insert(product)
+
+    def _insert(self, product: Product) -> None:
+        position = bisect_right(self._prices, product.price)
+        self._prices.insert(position, product.price)
+        self._products.insert(position, product)
+
+    def _remove(self, product: Product, price: float) -> None:
+        same_name = self._by_name.get(product.name, {})
+        same_name.pop(product, None)
+
+        if not same_name:
+            self._by_name.pop(product.name, None)
+
+        start = bisect_left(self._prices, price)
+        stop = bisect_right(self._prices, price)
+
+        for position in range(start, stop):
+            if self._products[position] is product:
+                del self._prices[position]
+                del self._products[position]
+                return
+
+    def find_by_name(self, name: str) -> List[Product]:
+        return list(self._by_name.get(name, ()))
+
+    def products_between(self, lo: float, hi: float) -> List[Product]:
+        start = bisect_left(self._prices, lo)
+        stop = bisect_right(self._prices, hi)
+        return self._products[start:stop]
+
+    def path_to(self, node: BoxStructure) -> List[BoxStructure]:
+        # caminho da raiz do índice até o nó, pelos ponteiros para o pai
+        path: List[BoxStructure] = []
+        current: Optional[BoxStructure] = node
+
+        while current is not None:
+            path.append(current)
+
+            if current is self.root:
+                path.reverse()
+                return path
+
+            current = current.parent
+
+        raise ValueError(f'{node.name} não está em {self.root.name}')
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+
+# Preço em paralelo
+#
+# As subárvores do primeiro nível são divididas entre processos criados
+# com fork: os processos filhos herdam a árvore já em memória e cada
+# tarefa recebe apenas um intervalo (início, fim) de filhos. A lista de
+# filhos chega a cada processo pelo initializer, então chamadas
+# simultâneas de parallel_price (em threads diferentes) não dividem
+# nenhum estado global do processo pai.
+
+_forked_children: List[BoxStructure] = []
+
+
+def _init_forked_children(children: List[BoxStructure]) -> None:
+    # roda em cada processo filho; com fork, os argumentos são herdados
+    # e não serializados
+    global _forked_children
+    _forked_children = children
+
+
+def _price_range(bounds: Tuple[int, int]) -> float:
+    start, stop = bounds
+    return fsum(
+        child.compute_price() for child in _forked_children[start:stop]
+    )
+
+
+def parallel_price(
+    tree: BoxStructure, workers: Optional[int] = None
+) -> float:
+    # recalcula o preço (sem o cache dos subtotais) usando vários núcleos
+    workers = workers or os.cpu_count() or 1
+    children = list(tree.children())
+
+    # sem fork, cada processo precisaria receber as folhas da sua
+    # partição, e só juntá-las já percorre a árvore inteira no processo
+    # pai (o mesmo custo de compute_price). Nesse caso, compute_price
+    if workers == 1 or len(children) < 2 \
+            or 'fork' not in get_all_start_methods():
+        return tree.compute_price()
+
+    # mais partições que processos, para equilibrar subárvores desiguais
+    size = max(1, -(-len(children) // (workers * 4)))
+    ranges = [
+        (start, min(start + size, len(children)))
+        for start in range(0, len(children), size)
+    ]
+
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=get_context('fork'),
+        initializer=_init_forked_children,
+        initargs=(children,),
+    ) as executor:
+        return fsum(executor.map(_price_range, ranges))
+
+
 if __name__ == '__main__':
     # Leaf
     camiseta1 = Product('camiseta1', 40.9)
@@ -105,3 +458,19 @@ if __name__ == '__main__':
     caixa_grande.add(caixa_smartphones)
     caixa_grande.print_content()
     print(caixa_grande.get_price())
+
+    # mudar o preço de uma folha atualiza só o caminho até a raiz
+    smartphone1.price = 9000
+    print(caixa_grande.get_price())
+
+    print([node.name for node in caixa_grande.iter_breadth_first()])
+    print([leaf.name for leaf in caixa_grande.iter_leaves()])
+
+    print(parallel_price(caixa_grande, workers=2))
+
+    # índices por nome e por faixa de preço
+    index = caixa_grande.create_index()
+    caixa_camisetas.add(Product('camiseta4', 25.9))
+    print([p.name for p in index.products_between(20, 35)])
+    print([p.price for p in index.find_by_name('smartphone1')])
+    print([node.name for node in index.path_to(camiseta2)])
@@ -0,0 +1,192 @@
+"""
+Composite "compilado" em arrays.
+
+Com milhões de Product, o grafo de objetos Box/Product do
+composite_1.py custa muita memória e somar preços vira um loop em
+Python. Aqui a árvore é achatada em colunas, na ordem de um percurso
+em profundidade (Euler tour / pré-ordem):
+
+- parents[i]: índice do pai do nó i (-1 na raiz);
+- ends[i]: a subárvore do nó i ocupa os índices [i, ends[i]);
+- prices[i]: preço da folha (0 nas caixas);
+- leaves[i]: 1 se o nó é um Product.
+
+Como toda subárvore é um intervalo contínuo, o total de todas as
+caixas sai de uma única soma acumulada: total(i) = acc[ends[i]] -
+acc[i]. Com NumPy isso é uma operação vetorizada; sem NumPy, o
+módulo array é usado. Essa versão é aproximada: o erro de cada total
+cresce com a soma da árvore inteira (até por volta de n * 2**-53 *
+acc[-1]), e não com a da subárvore. Por isso subtree_totals, por
+padrão, soma os preços como inteiros exatos, de baixo para cima, e
+devolve o mesmo valor de Box.get_price().
+
+A conversão funciona nos dois sentidos: CompiledTree.from_tree e
+CompiledTree.to_tree.
+"""
+from __future__ import annotations
+
+from array import array
+from itertools import accumulate
+from math import fsum
+from typing import Iterator, List, Sequence, Tuple
+
+from composite_1 import Box, BoxStructure, Product
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+
+class CompiledTree:
+    def __init__(
+        self,
+        names: List[str],
+        parents: Sequence[int],
+        prices: Sequence[float],
+        leaves: Sequence[int],
+    ) -> None:
+        self.names = names
+        self.parents = array('i', parents)
+        self.prices = array('d', prices)
+        self.leaves = array('b', leaves)
+        self.ends = self._compute_ends()
+
+    def _compute_ends(self) -> array:
+        # tamanho de cada subárvore, somado de baixo para cima
+        sizes = array('I', [1]) * len(self.parents)
+
+        for node in range(len(self.parents) - 1, 0, -1):
+            sizes[self.parents[node]] += sizes[node]
+
+        return array('I', (
+            node + size for node, size in enumerate(sizes)
+        ))
+
+    @classmethod
+    def from_tree(cls, root: BoxStructure) -> CompiledTree:
+        names: List[str] = []
+        parents = array('i')
+        prices = array('d')
+        leaves = array('b')
+        stack: List[Tuple[BoxStructure, int]] = [(root, -1)]
+
+        while stack:
+            node, parent = stack.pop()
+            index = len(names)
+            names.append(node.name)
+            parents.append(parent)
+
+            if isinstance(node, Product):
+                prices.append(node.price)
+                leaves.append(1)
+            else:
+                prices.append(0)
+                leaves.append(0)
+                stack.extend(
+                    (child, index) for child in reversed(node.children()))
+
+        return cls(names, parents, prices, leaves)
+
+    def to_tree(self) -> BoxStructure:
+        # de baixo para cima (pré-ordem invertida): cada caixa recebe os
+        # filhos já prontos com um único extend, quando ainda não tem
+        # pai. Assim nenhum add percorre os ancestrais: O(n), e não
+        # O(n * profundidade)
+        nodes: List[BoxStructure] = [None] * len(self.names)  # type: ignore
+        children: List[List[BoxStructure]] = [[] for _ in self.names]
+
+        for index in range(len(self.names) - 1, -1, -1):
+            name = self.names[index]
+
+            if self.leaves[index]:
+                node: BoxStructure = Product(name, self.prices[index])
+            else:
+                node = Box(name)
+                node.extend(reversed(children[index]))
+                children[index] = []
+
+            nodes[index] = node
+            parent = self.parents[index]
+
+            if parent != -1:
+                children[parent].append(node)
+
+        return nodes[0]
+
+    def subtree_totals(self, exact: bool = True) -> Sequence[float]:
+        # total de todas as subárvores de uma vez
+        if not exact:
+            return self._prefix_totals()
+
+        # todo float é m * 2**e: com um único expoente para todos os
+        # preços, cada um vira um inteiro e a soma não arredonda nada.
+        # int / int arredonda corretamente, como Box.get_price
+        ratios = [price.as_integer_ratio() for price in self.prices]
+        shift = max(
+            denominator.bit_length() for _, denominator in ratios) - 1
+        sums = [
+            numerator << (shift - denominator.bit_length() + 1)
+            for numerator, denominator in ratios
+        ]
+        parents = self.parents
+
+        # pré-ordem invertida: os filhos vêm antes dos pais
+        for node in range(len(sums) - 1, 0, -1):
+            sums[parents[node]] += sums[node]
+
+        scale = 1 << shift
+        return array('d', (total / scale for total in sums))
+
+    def _prefix_totals(self) -> Sequence[float]:
+        # aproximado: veja o erro na docstring do módulo
+        if np is not None:
+            acc = np.concatenate(([0.0], np.cumsum(self.prices)))
+            ends = np.frombuffer(self.ends, dtype=np.uint32)
+            return acc[ends] - acc[:-1]
+
+        acc = array('d', [0.0])
+        acc.extend(accumulate(self.prices))
+        return array('d', (
+            acc[end] - acc[start] for start, end in enumerate(self.ends)
+        ))
+
+    def subtree_total(self, index: int = 0) -> float:
+        # fsum: a soma exata arredondada uma única vez
+        return fsum(self.prices[index:self.ends[index]])
+
+    def children(self, index: int) -> Iterator[int]:
+        # o primeiro filho vem logo depois do pai; o próximo irmão
+        # começa onde termina a subárvore do anterior
+        child = index + 1
+
+        while child < self.ends[index]:
+            yield child
+            child = self.ends[child]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+if __name__ == '__main__':
+    caixa_camisetas = Box('Caixa de Camiseta')
+    caixa_camisetas.add(Product('camiseta1', 40.9))
+    caixa_camisetas.add(Product('camiseta2', 20.9))
+    caixa_camisetas.add(Product('camiseta3', 30.9))
+
+    caixa_smartphones = Box('Caixa de Smartphones')
+    caixa_smartphones.add(Product('smartphone1', 10000))
+    caixa_smartphones.add(Product('smartphone2', 10000))
+
+    caixa_grande = Box('Caixa grande')
+    caixa_grande.add(caixa_camisetas)
+    caixa_grande.add(caixa_smartphones)
+
+    compiled = CompiledTree.from_tree(caixa_grande)
+    totals = compiled.subtree_totals()
+
+    for index, name in enumerate(compiled.names):
+        if not compiled.leaves[index]:
+            print(name, round(totals[index], 2))
+
+    print(compiled.to_tree().get_price())
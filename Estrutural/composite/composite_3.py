@@ -0,0 +1,188 @@
+"""
+Composite salvo em formato binário e carregado sob demanda com mmap.
+
+Reconstruir a árvore a partir de JSON obriga o processo a criar todos
+os Box/Product antes de responder qualquer coisa. Aqui a árvore é
+gravada num arquivo binário:
+
+- cabeçalho: assinatura, quantidade de nós e tamanho das strings;
+- tabela de nós em pré-ordem, um registro de tamanho fixo por nó
+(pai, fim da subárvore, posição e tamanho do nome, preço, folha?);
+- todos os nomes em UTF-8, um depois do outro.
+
+Nas caixas, o preço gravado já é o subtotal da subárvore.
+
+O arquivo é aberto com mmap e nada é lido de imediato. MappedTree.root
+devolve um MappedBox, que só cria os seus filhos (MappedBox e Product)
+quando alguém pede por eles. Assim, abrir o arquivo é quase
+instantâneo e só as subárvores visitadas viram objetos Python.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+from fractions import Fraction
+from typing import BinaryIO, Iterable, Iterator, KeysView, Tuple
+
+from composite_1 import Box, BoxStructure, Product
+from composite_2 import CompiledTree
+
+MAGIC = b'BOX1'
+HEADER = struct.Struct('<4sII')  # assinatura, nós, bytes de strings
+NODE = struct.Struct('<iIIId?')  # pai, fim, nome (início, tamanho), preço
+
+
+def dump(tree: BoxStructure, file: BinaryIO) -> None:
+    compiled = CompiledTree.from_tree(tree)
+    # totais exatos: o mesmo valor de Box.get_price de cada caixa
+    totals = compiled.subtree_totals(exact=True)
+    names = [name.encode() for name in compiled.names]
+
+    file.write(HEADER.pack(MAGIC, len(names), sum(map(len, names))))
+
+    offset = 0
+    for index, name in enumerate(names):
+        file.write(NODE.pack(
+            compiled.parents[index], compiled.ends[index],
+            offset, len(name),
+            compiled.prices[index] if compiled.leaves[index]
+            else totals[index],
+            bool(compiled.leaves[index]),
+        ))
+        offset += len(name)
+
+    for name in names:
+        file.write(name)
+
+
+class MappedTree:
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(
+            self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.node_count, _ = HEADER.unpack_from(self._map, 0)
+
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(
+                f'{path} não é uma árvore no formato {MAGIC!r}')
+
+        self._strings = HEADER.size + self.node_count * NODE.size
+
+    def _record(self, index: int) -> Tuple[int, int, int, int, float, bool]:
+        return NODE.unpack_from(self._map, HEADER.size + index * NODE.size)
+
+    def name(self, index: int) -> str:
+        _, _, offset, size, _, _ = self._record(index)
+        start = self._strings + offset
+        return self._map[start:start + size].decode()
+
+    def price(self, index: int) -> float:
+        return self._record(index)[4]
+
+    def child_indices(self, index: int) -> Iterator[int]:
+        # mesmo layout do CompiledTree: o primeiro filho vem logo depois
+        # do pai e o próximo irmão começa onde a subárvore anterior acaba
+        end = self._record(index)[1]
+        child = index + 1
+
+        while child < end:
+            yield child
+            child = self._record(child)[1]
+
+    def node(self, index: int) -> BoxStructure:
+        _, _, _, _, price, leaf = self._record(index)
+
+        if leaf:
+            return Product(self.name(index), price)
+
+        return MappedBox(self, index, self.name(index), price)
+
+    @property
+    def root(self) -> BoxStructure:
+        return self.node(0)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> MappedTree:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class MappedBox(Box):
+    # Composite carregado do arquivo: os filhos só são criados quando
+    # alguém os acessa
+    def __init__(
+        self, tree: MappedTree, index: int, name: str, subtotal: float
+    ) -> None:
+        super().__init__(name)
+        self._subtotal = Fraction(subtotal)
+        self._tree = tree
+        self._index = index
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        self._loaded = True
+
+        # o subtotal já veio do arquivo, então os filhos entram sem
+        # recalcular os preços dos ancestrais
+        exact = Fraction(0)
+
+        for child_index in self._tree.child_indices(self._index):
+            child = self._tree.node(child_index)
+            child.parent = self
+            self._children[child] = None
+            exact += child._exact_price()
+
+        # o valor do arquivo é a soma exata já arredondada para float:
+        # troca pela soma exata dos filhos (e corrige os ancestrais), para
+        # que esvaziar a caixa dê exatamente 0
+        self._adjust_price(exact - self._subtotal)
+
+    def children(self) -> KeysView[BoxStructure]:
+        self._load()
+        return super().children()
+
+    def extend(self, children: Iterable[BoxStructure]) -> None:
+        self._load()
+        super().extend(children)
+
+    def remove_many(self, children: Iterable[BoxStructure]) -> None:
+        self._load()
+        super().remove_many(children)
+
+
+if __name__ == '__main__':
+    caixa_camisetas = Box('Caixa de Camiseta')
+    caixa_camisetas.add(Product('camiseta1', 40.9))
+    caixa_camisetas.add(Product('camiseta2', 20.9))
+    caixa_camisetas.add(Product('camiseta3', 30.9))
+
+    caixa_smartphones = Box('Caixa de Smartphones')
+    caixa_smartphones.add(Product('smartphone1', 10000))
+    caixa_smartphones.add(Product('smartphone2', 10000))
+
+    caixa_grande = Box('Caixa grande')
+    caixa_grande.add(caixa_camisetas)
+    caixa_grande.add(caixa_smartphones)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'caixas.bin')
+
+        with open(path, 'wb') as file:
+            dump(caixa_grande, file)
+
+        with MappedTree(path) as tree:
+            root = tree.root
+            print(root.get_price())  # sem criar nenhum filho
+            root.print_content()
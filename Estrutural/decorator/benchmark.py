@@ -0,0 +1,168 @@
+"""
+Benchmarks das variações do padrão Decorator.
+
+Uso:
+    python benchmark.py            # roda todos
+    python benchmark.py stack      # roda apenas um deles
+"""
+from __future__ import annotations
+
+import random
+import sys
+import tracemalloc
+from copy import deepcopy
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from decorator_2 import (Bacon, HotdogDecorator, Ingredient, SimpleHotdog,
+                         SpecialHotdog)
+from decorator_3 import MENU, OrderBatch, PricingEngine, np
+
+
+class DeepcopyDecorator:
+    # o decorador original: copia todos os ingredientes a cada camada
+    def __init__(self, hotdog, ingredient: Ingredient) -> None:
+        self.hotdog = hotdog
+        self._ingredients: List[Ingredient] = deepcopy(hotdog.ingredients)
+        self._ingredients.append(ingredient)
+
+    @property
+    def ingredients(self) -> List[Ingredient]:
+        return self._ingredients
+
+    @property
+    def price(self) -> float:
+        return round(sum([
+            ingredient.price for ingredient in self._ingredients
+        ]), 2)
+
+
+def build_stack(decorator: Callable, depth: int) -> Any:
+    hotdog: Any = SimpleHotdog()
+
+    for _ in range(depth):
+        hotdog = decorator(hotdog, Bacon())
+
+    return hotdog
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, float, int]:
+    tracemalloc.start()
+    start = perf_counter()
+    result = build()
+    elapsed = perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+
+def bench_stack(depth: int = 1000) -> None:
+    # montar uma pilha de `depth` decoradores
+    print(f'profundidade: {depth}')
+
+    for name, decorator in (
+        ('deepcopy (original)', DeepcopyDecorator),
+        ('cadeia compartilhada', HotdogDecorator),
+    ):
+        hotdog, elapsed, memory = measure(
+            lambda: build_stack(decorator, depth))
+        print(f'{name:<22} {elapsed:8.3f}s {memory / 2 ** 20:8.2f} MiB '
+              f'(preço {hotdog.price})')
+
+
+def bench_price(depth: int = 1000, reads: int = 10_000) -> None:
+    # leituras de price numa pilha profunda: recalcular x total acumulado
+    hotdog = build_stack(HotdogDecorator, depth)
+
+    def recomputed_price() -> float:
+        # como HotDog.price era calculado antes
+        return round(sum([
+            ingredient.price for ingredient in hotdog.ingredients
+        ]), 2)
+
+    print(f'profundidade: {depth}, leituras: {reads}')
+
+    for name, read in (
+        ('soma a cada leitura', recomputed_price),
+        ('total acumulado', lambda: hotdog.price),
+    ):
+        start = perf_counter()
+        for _ in range(reads):
+            read()
+        elapsed = perf_counter() - start
+        print(f'{name:<22} {elapsed / reads * 1e6:10.2f}µs por leitura')
+
+
+def bench_freeze(depth: int = 100, reads: int = 10_000) -> None:
+    # name + price + ingredients: pilha de decoradores x hotdog congelado
+    hotdog = build_stack(HotdogDecorator, depth)
+    frozen = hotdog.freeze()
+    assert (frozen.name, frozen.price) == (hotdog.name, hotdog.price)
+
+    print(f'profundidade: {depth}, leituras: {reads}')
+
+    for name, item in (('decorado', hotdog), ('freeze()', frozen)):
+        start = perf_counter()
+        for _ in range(reads):
+            item.name, item.price, item.ingredients
+        elapsed = perf_counter() - start
+        print(f'{name:<22} {elapsed / reads * 1e6:10.2f}µs por leitura')
+
+
+def bench_bulk(orders: int = 200_000) -> None:
+    # um grafo de objetos por pedido x pedidos compactos em lote
+    rng = random.Random(42)
+    specs = [
+        (rng.random() < 0.3, rng.choices(MENU, k=rng.randint(0, 4)))
+        for _ in range(orders)
+    ]
+    engine = PricingEngine()
+
+    start = perf_counter()
+    object_prices = []
+    for special, extras in specs:
+        hotdog: Any = SpecialHotdog() if special else SimpleHotdog()
+        for extra in extras:
+            hotdog = HotdogDecorator(hotdog, extra)
+        object_prices.append(hotdog.price)
+    object_time = perf_counter() - start
+
+    start = perf_counter()
+    simple = engine.encode(SimpleHotdog())
+    special_ids = engine.encode(SpecialHotdog())
+    batch = OrderBatch()
+    for special, extras in specs:
+        batch.add([
+            *(special_ids if special else simple),
+            *(engine.ingredient_id(extra) for extra in extras),
+        ])
+    encode_time = perf_counter() - start
+
+    start = perf_counter()
+    batch_prices = engine.price_batch(batch)
+    price_time = perf_counter() - start
+
+    assert list(batch_prices) == object_prices
+
+    print(f'pedidos: {orders} (NumPy: {"sim" if np is not None else "não"})')
+    print(f'objetos:              {orders / object_time:12,.0f} pedidos/s')
+    print(f'em lote (total):      '
+          f'{orders / (encode_time + price_time):12,.0f} pedidos/s')
+    print(f'  codificação:        {orders / encode_time:12,.0f} pedidos/s')
+    print(f'  soma segmentada:    {orders / price_time:12,.0f} pedidos/s')
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    'stack': bench_stack,
+    'price': bench_price,
+    'freeze': bench_freeze,
+    'bulk': bench_bulk,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f'--- {name} ---')
+        BENCHMARKS[name]()
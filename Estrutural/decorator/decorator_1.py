@@ -15,89 +15,11 @@ Do livro "Python Fluente", por Luciano Ramalho (pág. 223)
 """
 from __future__ import annotations
 
-from copy import deepcopy
-from dataclasses import dataclass
 from typing import List
 
-
-# INGREDIENTS
-@dataclass
-class Ingredient:
-    price: float
-
-
-@dataclass
-class Bread(Ingredient):
-    price: float = 1.50
-
-
-@dataclass
-class Sausage(Ingredient):
-    price: float = 4.99
-
-
-@dataclass
-class Bacon(Ingredient):
-    price: float = 7.99
-
-
-@dataclass
-class Egg(Ingredient):
-    price: float = 1.50
-
-
-@dataclass
-class Cheese(Ingredient):
-    price: float = 6.35
-
-
-@dataclass
-class MashedPotatoes(Ingredient):
-    price: float = 2.25
-
-
-@dataclass
-class PotatoSticks(Ingredient):
-    price: float = 0.99
-
-
-class HotDog:
-    _name: str
-    _ingredients: List[Ingredient]
-
-    @property
-    def price(self) -> float:
-        return round(sum([
-            ingredient.price for ingredient in self._ingredients
-        ]), 2)
-
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @property
-    def ingredients(self) -> List[Ingredient]:
-        return self._ingredients
-
-    def __repr__(self) -> str:
-        return f'{self.name}({self.price} -> {self.ingredients})'
-
-
-class SimpleHotdog(HotDog):
-    def __init__(self) -> None:
-        self._name = 'SimpleHotdog'
-        self._ingredients: List[Ingredient] = [
-            Bread(), Sausage(), PotatoSticks()
-        ]
-
-
-class SpecialHotdog(HotDog):
-    def __init__(self) -> None:
-        self._name = 'SimpleHotdog'
-        self._ingredients: List[Ingredient] = [
-            Bread(), Sausage(), PotatoSticks(),
-            Bacon(), Egg(), Cheese(), MashedPotatoes()
-        ]
+# ingredientes (flyweights), a cadeia de ingredientes e os hotdogs base
+# são os mesmos do decorator_2.py; aqui muda só o decorador
+from decorator_2 import Bacon, HotDog, SimpleHotdog, SpecialHotdog
 
 
 # Decorators
@@ -105,40 +27,33 @@ class HotdogDecorator(HotDog):
     def __init__(self, hotdog: HotDog) -> None:
         self.hotdog = hotdog
 
-    @property
-    def price(self) -> float:
-        return self.hotdog.price
+        # a cadeia de ingredientes é compartilhada, nunca copiada
+        self._ingredients = self.hotdog._ingredients
 
     @property
     def name(self) -> str:
-        return self.hotdog.name
+        # percorre os decoradores sem recursão
+        names: List[str] = []
+        hotdog: HotDog = self
 
-    @property
-    def ingredients(self) -> List[Ingredient]:
-        return self.hotdog.ingredients
+        while isinstance(hotdog, HotdogDecorator):
+            ingredient = getattr(hotdog, '_ingredient', None)
+
+            if ingredient is not None:
+                names.append(ingredient.__class__.__name__)
+
+            hotdog = hotdog.hotdog
+
+        return ' + '.join([hotdog.name, *reversed(names)])
 
 
 class BaconDecorator(HotdogDecorator):
     def __init__(self, hotdog: HotDog) -> None:
         super().__init__(hotdog)
 
+        # O(1): só um nó novo na frente da cadeia do hotdog embrulhado
         self._ingredient = Bacon()
-        self._ingredients = deepcopy(self.hotdog.ingredients)
-        self._ingredients.append(self._ingredient)
-
-    @property
-    def price(self) -> float:
-        return round(sum([
-            ingredient.price for ingredient in self._ingredients
-        ]), 2)
-
-    @property
-    def name(self) -> str:
-        return f'{self.hotdog.name} + {self._ingredient.__class__.__name__}'
-
-    @property
-    def ingredients(self) -> List[Ingredient]:
-        return self._ingredients
+        self._ingredients = self._ingredients.add(self._ingredient)
 
 
 if __name__ == '__main__':
@@ -153,3 +68,6 @@ if __name__ == '__main__':
 
     bacon_simple_hotdog = BaconDecorator(simple_hotdog)
     print(bacon_simple_hotdog)
+
+    menu_item = BaconDecorator(bacon_simple_hotdog).freeze()
+    print(menu_item)
@@ -15,69 +15,162 @@ Do livro "Python Fluente", por Luciano Ramalho (pág. 223)
 """
 from __future__ import annotations
 
-from copy import deepcopy
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from weakref import WeakValueDictionary
 
 
 # INGREDIENTS
-@dataclass
-class Ingredient:
+class IngredientFlyweight(type):
+    # metaclass: ingredientes iguais são sempre a mesma instância, então
+    # milhões de pedidos compartilham um único Bread(), Bacon()...
+    #
+    # a chave é o valor construído (classe + campos), então Bread(),
+    # Bread(1.50) e Bread(price=1.50) caem na mesma entrada. O registro
+    # guarda referências fracas: um Bacon(price=x) que nenhum pedido usa
+    # mais sai dele, e preços dinâmicos não o fazem crescer sem limite
+    _instances: WeakValueDictionary = WeakValueDictionary()
+
+    # atalho para a chamada mais comum, sem argumentos (Bread()): uma
+    # entrada por classe, então este dict é limitado
+    _defaults: Dict[Any, Any] = {}
+
+    def __call__(cls, *args, **kwargs):
+        if not args and not kwargs:
+            try:
+                return cls._defaults[cls]
+            except KeyError:
+                ingredient = cls._defaults[cls] = cls._flyweight()
+                return ingredient
+
+        return cls._flyweight(*args, **kwargs)
+
+    def _flyweight(cls, *args, **kwargs):
+        ingredient = super().__call__(*args, **kwargs)
+        key = (cls, *(
+            getattr(ingredient, name) for name in cls.__dataclass_fields__
+        ))
+        return cls._instances.setdefault(key, ingredient)
+
+
+# weakref_slot: as instâncias precisam de __weakref__ para o registro
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Ingredient(metaclass=IngredientFlyweight):
     price: float
 
+    # imutável e compartilhado: copiar não faz sentido
+    def __copy__(self) -> Ingredient:
+        return self
 
-@dataclass
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Ingredient:
+        return self
+
+
+@dataclass(frozen=True, slots=True)
 class Bread(Ingredient):
     price: float = 1.50
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Sausage(Ingredient):
     price: float = 4.99
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Bacon(Ingredient):
     price: float = 7.99
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Egg(Ingredient):
     price: float = 1.50
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Cheese(Ingredient):
     price: float = 6.35
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MashedPotatoes(Ingredient):
     price: float = 2.25
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PotatoSticks(Ingredient):
     price: float = 0.99
 
 
+class IngredientChain:
+    # lista persistente (encadeada de trás para frente): um decorador
+    # cria só um novo nó apontando para a cadeia do hotdog embrulhado,
+    # que é compartilhada e nunca copiada
+    #
+    # cada nó guarda o total acumulado até ele; como os nós e os
+    # ingredientes são imutáveis, esse total nunca fica desatualizado
+    __slots__ = ('ingredient', 'previous', 'total')
+
+    ingredient: Ingredient
+    previous: Optional[IngredientChain]
+    total: float
+
+    def __init__(
+        self, ingredient: Ingredient, previous: Optional[IngredientChain]
+    ) -> None:
+        total = ingredient.price if previous is None \
+            else previous.total + ingredient.price
+
+        object.__setattr__(self, 'ingredient', ingredient)
+        object.__setattr__(self, 'previous', previous)
+        object.__setattr__(self, 'total', total)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{self.__class__.__name__} é imutável')
+
+    @classmethod
+    def of(cls, *ingredients: Ingredient) -> IngredientChain:
+        chain: Optional[IngredientChain] = None
+
+        for ingredient in ingredients:
+            chain = cls(ingredient, chain)
+
+        assert chain is not None
+        return chain
+
+    def add(self, ingredient: Ingredient) -> IngredientChain:
+        return IngredientChain(ingredient, self)
+
+    def __iter__(self) -> Iterator[Ingredient]:
+        ingredients: List[Ingredient] = []
+        node: Optional[IngredientChain] = self
+
+        while node is not None:
+            ingredients.append(node.ingredient)
+            node = node.previous
+
+        return reversed(ingredients)
+
+
 class HotDog:
     _name: str
-    _ingredients: List[Ingredient]
+    _ingredients: IngredientChain
 
     @property
     def price(self) -> float:
-        return round(sum([
-            ingredient.price for ingredient in self._ingredients
-        ]), 2)
+        # O(1): total acumulado no último nó da cadeia
+        return round(self._ingredients.total, 2)
 
     @property
     def name(self) -> str:
         return self._name
 
     @property
-    def ingredients(self) -> List[Ingredient]:
-        return self._ingredients
+    def ingredients(self) -> Sequence[Ingredient]:
+        return list(self._ingredients)
+
+    def freeze(self) -> FrozenHotdog:
+        # "compila" o hotdog (e todos os decoradores) num objeto plano
+        return FrozenHotdog(self)
 
     def __repr__(self) -> str:
         return f'{self.name}({self.price} -> {self.ingredients})'
@@ -86,18 +179,18 @@ class HotDog:
 class SimpleHotdog(HotDog):
     def __init__(self) -> None:
         self._name = 'SimpleHotdog'
-        self._ingredients: List[Ingredient] = [
+        self._ingredients = IngredientChain.of(
             Bread(), Sausage(), PotatoSticks()
-        ]
+        )
 
 
 class SpecialHotdog(HotDog):
     def __init__(self) -> None:
         self._name = 'SimpleHotdog'
-        self._ingredients: List[Ingredient] = [
+        self._ingredients = IngredientChain.of(
             Bread(), Sausage(), PotatoSticks(),
             Bacon(), Egg(), Cheese(), MashedPotatoes()
-        ]
+        )
 
 
 # Decorators
@@ -106,15 +199,48 @@ class HotdogDecorator(HotDog):
         self.hotdog = hotdog
         self._ingredient = ingredient
 
-        self._ingredients = deepcopy(self.hotdog.ingredients)
-        self._ingredients.append(ingredient)
+        # O(1): reaproveita a cadeia do hotdog embrulhado
+        self._ingredients = self.hotdog._ingredients.add(ingredient)
 
     @property
     def name(self) -> str:
-        return f'{self.hotdog.name} + {self._ingredient.__class__.__name__}'
+        # percorre os decoradores sem recursão
+        names: List[str] = []
+        hotdog: HotDog = self
+
+        while isinstance(hotdog, HotdogDecorator):
+            names.append(hotdog._ingredient.__class__.__name__)
+            hotdog = hotdog.hotdog
+
+        return ' + '.join([hotdog.name, *reversed(names)])
+
+
+class FrozenHotdog(HotDog):
+    # nome, preço e ingredientes calculados uma única vez: acessar
+    # qualquer um deles não percorre mais a pilha de decoradores
+    def __init__(self, hotdog: HotDog) -> None:
+        self._name = hotdog.name
+        self._price = hotdog.price
+        self._ingredients = hotdog._ingredients
+        self._ingredient_tuple: Tuple[Ingredient, ...] = \
+            tuple(hotdog._ingredients)
+
+    @property
+    def price(self) -> float:
+        return self._price
+
+    @property
+    def ingredients(self) -> Sequence[Ingredient]:
+        return self._ingredient_tuple
+
+    def freeze(self) -> FrozenHotdog:
+        return self
 
 
 if __name__ == '__main__':
     simple_hotdog = SimpleHotdog()
     bacon_simple_hotdog = HotdogDecorator(simple_hotdog, MashedPotatoes())
     print(bacon_simple_hotdog)
+
+    menu_item = HotdogDecorator(bacon_simple_hotdog, Bacon()).freeze()
+    print(menu_item)
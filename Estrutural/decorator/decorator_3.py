@@ -0,0 +1,116 @@
+"""
+Precificação de pedidos em lote.
+
+No horário de pico, montar um SimpleHotdog/SpecialHotdog com os seus
+decoradores para cada pedido só para ler o price custa um grafo de
+objetos por pedido. Aqui cada pedido é apenas uma sequência de ids de
+ingredientes, e todos os pedidos ficam juntos num único array (com um
+array de offsets marcando onde cada pedido começa).
+
+O preço de todos os pedidos sai de uma soma segmentada sobre o vetor
+de preços: com NumPy, np.add.reduceat; sem NumPy, um loop simples.
+Os preços são somados em centavos (inteiros), então o resultado é
+exato e igual ao round(..., 2) de HotDog.price.
+"""
+from __future__ import annotations
+
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from decorator_2 import (Bacon, Bread, Cheese, Egg, HotDog, HotdogDecorator,
+                         Ingredient, MashedPotatoes, PotatoSticks, Sausage,
+                         SimpleHotdog, SpecialHotdog)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+MENU: List[Ingredient] = [
+    Bread(), Sausage(), Bacon(), Egg(), Cheese(), MashedPotatoes(),
+    PotatoSticks(),
+]
+
+
+class OrderBatch:
+    # pedidos em formato compacto: ids de todos os pedidos em sequência
+    def __init__(self) -> None:
+        self.ingredient_ids = array('I')
+        self.offsets = array('Q', [0])
+
+    def add(self, ingredient_ids: Iterable[int]) -> None:
+        self.ingredient_ids.extend(ingredient_ids)
+        self.offsets.append(len(self.ingredient_ids))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class PricingEngine:
+    def __init__(self, menu: Optional[Sequence[Ingredient]] = None) -> None:
+        self.menu = list(MENU if menu is None else menu)
+
+        # ingredientes são flyweights imutáveis: dá para usá-los como chave
+        self._ids: Dict[Ingredient, int] = {
+            ingredient: ingredient_id
+            for ingredient_id, ingredient in enumerate(self.menu)
+        }
+        self.cents = array('q', (
+            round(ingredient.price * 100) for ingredient in self.menu
+        ))
+
+    def ingredient_id(self, ingredient: Ingredient) -> int:
+        return self._ids[ingredient]
+
+    def encode(self, hotdog: HotDog) -> List[int]:
+        return [self._ids[ingredient] for ingredient in hotdog.ingredients]
+
+    def price_batch(self, batch: OrderBatch) -> Sequence[float]:
+        if not len(batch):
+            return array('d')
+
+        if np is not None:
+            cents = np.frombuffer(self.cents, dtype=np.int64)
+            ids = np.frombuffer(batch.ingredient_ids, dtype=np.uint32)
+            offsets = np.frombuffer(
+                batch.offsets, dtype=np.uint64).astype(np.intp)
+            starts, ends = offsets[:-1], offsets[1:]
+
+            # reduceat devolve cents[start] para um segmento vazio (e falha
+            # se ele for o último): soma só os pedidos com ingredientes.
+            # Entre dois pedidos não vazios só há pedidos vazios, então
+            # cada segmento do reduceat é exatamente um pedido
+            filled = starts != ends
+            totals = np.zeros(len(batch), dtype=np.int64)
+            if filled.any():
+                totals[filled] = np.add.reduceat(cents[ids], starts[filled])
+            return totals / 100
+
+        cents = self.cents
+        ids = batch.ingredient_ids
+        offsets = batch.offsets
+        totals = array('q', accumulate(
+            (cents[ingredient_id] for ingredient_id in ids), initial=0
+        ))
+        return array('d', (
+            (totals[offsets[order + 1]] - totals[offsets[order]]) / 100
+            for order in range(len(batch))
+        ))
+
+
+if __name__ == '__main__':
+    engine = PricingEngine()
+    hotdogs = [
+        SimpleHotdog(),
+        SpecialHotdog(),
+        HotdogDecorator(SimpleHotdog(), Bacon()),
+        HotdogDecorator(HotdogDecorator(SpecialHotdog(), Egg()), Cheese()),
+    ]
+
+    batch = OrderBatch()
+    for hotdog in hotdogs:
+        batch.add(engine.encode(hotdog))
+
+    print(list(engine.price_batch(batch)))
+    print([hotdog.price for hotdog in hotdogs])
@@ -8,8 +8,17 @@ usado.
 """
 from __future__ import annotations
 
+import os
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict
+
+# o registro de observers é o mesmo do Comportamental/observer
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', '..', 'Comportamental', 'observer'))
+
+from observer_registry import ObserverRegistry  # noqa: E402
 
 
 class IObservable(ABC):
@@ -33,7 +42,7 @@ class WeatherStation(IObservable):
     # Observable
 
     def __init__(self) -> None:
-        self._observers: List[IObserver] = []
+        self._observers: ObserverRegistry[IObserver] = ObserverRegistry()
         self._state: Dict = {}
 
     @property
@@ -53,13 +62,13 @@ class WeatherStation(IObservable):
         self.notify_observers()
 
     def add_observer(self, observer: IObserver) -> None:
-        self._observers.append(observer)
+        self._observers.add(observer)
 
     def remove_observer(self, observer: IObserver) -> None:
         if observer not in self._observers:
             return
 
-        self._observers.remove(observer)
+        self._observers.discard(observer)
 
     def notify_observers(self) -> None:
         for observer in self._observers:
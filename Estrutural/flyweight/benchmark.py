@@ -0,0 +1,172 @@
+"""
+Benchmarks das variações do padrão Flyweight.
+
+Uso:
+    python benchmark.py                    # roda todos
+    python benchmark.py columnar           # roda apenas um deles
+    CLIENTS=100000 python benchmark.py     # muda a escala (padrão 1M)
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from flyweight_1 import Address, AddressFactory, Client
+from flyweight_2 import AddressStore
+
+CLIENTS = int(os.environ.get('CLIENTS', 1_000_000))
+
+ClientRow = Tuple[str, str, str, str, str, str]
+
+
+def generate_rows(clients: int) -> Iterator[ClientRow]:
+    # poucos endereços distintos, muitos clientes (cenário do flyweight)
+    for i in range(clients):
+        yield (
+            f'client{i}', str(i % 1000), 'casa' if i % 2 else 'apto',
+            f'Rua {i % 5000}', f'Bairro {i % 300}', f'{i % 5000:07d}-00',
+        )
+
+
+def measure(build: Callable[[], object]) -> Tuple[object, int, float]:
+    tracemalloc.start()
+    start = perf_counter()
+    result = build()
+    elapsed = perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def bench_columnar(clients: int = CLIENTS) -> None:
+    # modelo de objetos (flyweight_1.py) x armazenamento colunar
+    rows = list(generate_rows(clients))
+
+    def build_objects() -> object:
+        factory = AddressFactory(verbose=False)
+        objects = []
+
+        for name, number, detail, street, neighborhood, zip_code in rows:
+            client = Client(name)
+            client.address_number = number
+            client.address_detail = detail
+            client.add_address(factory.get_address(
+                street=street, neighborhood=neighborhood, zip_code=zip_code))
+            objects.append(client)
+
+        return objects
+
+    def build_columnar() -> object:
+        store = AddressStore()
+
+        for name, number, detail, street, neighborhood, zip_code in rows:
+            client_id = store.add_client(name, number, detail)
+            store.add_address(client_id, store.get_address(
+                street, neighborhood, zip_code))
+
+        return store
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([
+        'name', 'address_number', 'address_detail',
+        'street', 'neighborhood', 'zip_code',
+    ])
+    writer.writerows(rows)
+    data = buffer.getvalue()
+
+    def build_from_csv() -> object:
+        store = AddressStore()
+        store.load_csv(io.StringIO(data))
+        return store
+
+    print(f'clientes: {clients}')
+
+    for name, build in (
+        ('objetos (flyweight_1)', build_objects),
+        ('colunar (flyweight_2)', build_columnar),
+        ('colunar via CSV', build_from_csv),
+    ):
+        result, memory, elapsed = measure(build)
+        print(f'{name:<24} {memory / 2 ** 20:8.1f} MiB '
+              f'({memory / clients:6.1f} bytes/cliente) em {elapsed:.2f}s')
+        del result
+
+
+class DictClient:
+    # Client antes do __slots__, como referência
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._addresses: List = []
+
+    def add_address(self, address: object) -> None:
+        self._addresses.append(address)
+
+
+class DictAddress:
+    # Address antes do __slots__, como referência
+    def __init__(self, street: str, neighborhood: str, zip_code: str) -> None:
+        self._street = street
+        self._neighborhood = neighborhood
+        self._zip_code = zip_code
+
+
+def bench_slots() -> None:
+    # bytes por instância, sem contar as strings (criadas antes da medição)
+    for count in sorted({100_000, CLIENTS}):
+        names = [f'client{i}' for i in range(count)]
+        streets = [f'Rua {i}' for i in range(count)]
+        address = Address('Rua Tal', 'centro', '0000000-00')
+
+        def build_clients(client_class: type) -> Callable[[], object]:
+            def build() -> object:
+                clients = [client_class(name) for name in names]
+
+                for client in clients:
+                    client.address_number = '50'
+                    client.address_detail = 'casa'
+                    client.add_address(address)
+
+                return clients
+
+            return build
+
+        def build_addresses(address_class: type) -> Callable[[], object]:
+            def build() -> object:
+                return [
+                    address_class(street, 'centro', '0000000-00')
+                    for street in streets
+                ]
+
+            return build
+
+        print(f'instâncias: {count}')
+
+        for name, build in (
+            ('Client (__dict__)', build_clients(DictClient)),
+            ('Client (__slots__)', build_clients(Client)),
+            ('Address (__dict__)', build_addresses(DictAddress)),
+            ('Address (__slots__)', build_addresses(Address)),
+        ):
+            result, memory, _ = measure(build)
+            print(f'  {name:<20} {memory / count:6.1f} bytes/instância')
+            del result
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    'columnar': bench_columnar,
+    'slots': bench_slots,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f'--- {name} ---')
+        BENCHMARKS[name]()
@@ -33,11 +33,21 @@ que é exterior.
 """
 from __future__ import annotations
 
-from typing import Dict, List
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple
+from weakref import WeakValueDictionary
+
+AddressKey = Tuple[str, str, str]
 
 
 class Client:
     # Context
+    # __slots__: sem __dict__ por instância
+    __slots__ = ('name', '_addresses', 'address_number', 'address_detail')
+
     def __init__(self, name: str) -> None:
         self.name = name
         self._addresses: List = []
@@ -56,10 +66,36 @@ class Client:
 
 class Address:
     # FlyWeight
+    # imutável e sem __dict__; __weakref__ permite o pool com weakref
+    __slots__ = ('_street', '_neighborhood', '_zip_code', '__weakref__')
+
+    _street: str
+    _neighborhood: str
+    _zip_code: str
+
     def __init__(self, street: str, neighborhood: str, zip_code: str) -> None:
-        self._street = street
-        self._neighborhood = neighborhood
-        self._zip_code = zip_code
+        object.__setattr__(self, '_street', street)
+        object.__setattr__(self, '_neighborhood', neighborhood)
+        object.__setattr__(self, '_zip_code', zip_code)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{self.__class__.__name__} é imutável')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{self.__class__.__name__} é imutável')
+
+    @property
+    def key(self) -> AddressKey:
+        return (self._street, self._neighborhood, self._zip_code)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Address):
+            return NotImplemented
+
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
 
     def show_address(self, address_number: str, address_detail: str) -> None:
         print(
@@ -69,25 +105,127 @@ class Address:
         )
 
 
+ADDRESS_SIZE = sys.getsizeof(Address('', '', ''))
+
+
+class _Shard:
+    # parte do pool protegida pelo seu próprio lock
+    def __init__(self, weak: bool, capacity: Optional[int]) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        self.addresses: MutableMapping[AddressKey, Address] = \
+            WeakValueDictionary() if weak else OrderedDict()
+
+    def get_or_create(self, key: AddressKey) -> Tuple[Address, bool]:
+        # check-then-insert atômico: um único flyweight por chave
+        with self.lock:
+            try:
+                address_flyweight = self.addresses[key]
+            except KeyError:
+                address_flyweight = Address(*key)
+                self.addresses[key] = address_flyweight
+                self.misses += 1
+                self._evict()
+                return address_flyweight, False
+
+            if isinstance(self.addresses, OrderedDict):
+                self.addresses.move_to_end(key)
+
+            self.hits += 1
+            return address_flyweight, True
+
+    def _evict(self) -> None:
+        if self.capacity is None:
+            return
+
+        # remove os mais antigos (no modo forte, os menos usados)
+        while len(self.addresses) > self.capacity:
+            oldest = next(iter(self.addresses))
+            del self.addresses[oldest]
+
+
 class AddressFactory:
-    _addresses: Dict = {}
+    # Flyweight factory
+    #
+    # weak=True: o flyweight sai do pool assim que nenhum cliente usa mais
+    # capacity: quantidade máxima de flyweights guardados no pool
+    # shards: o pool é dividido em partes com locks independentes, para
+    # que várias threads possam usar a fábrica ao mesmo tempo (só sem
+    # capacity)
+    def __init__(
+        self,
+        weak: bool = False,
+        capacity: Optional[int] = None,
+        verbose: bool = True,
+        shards: int = 16,
+    ) -> None:
+        self.weak = weak
+        self.capacity = capacity
+        self.verbose = verbose
 
-    def _get_key(self, **kwargs) -> str:
-        return ''.join(kwargs.values())
+        # com capacity, um único shard: o limite e a ordem de remoção
+        # valem para o pool inteiro, o que exigiria um lock global de
+        # qualquer forma. Dividir o limite entre os shards não o garante,
+        # já que as chaves não se espalham por igual
+        if capacity is not None:
+            shards = 1
+
+        self._shards = [_Shard(weak, capacity) for _ in range(shards)]
+
+    def _get_key(
+        self, street: str, neighborhood: str, zip_code: str
+    ) -> AddressKey:
+        # tupla: ('Rua A', 'B') e ('Rua', ' AB') são chaves diferentes
+        return (street, neighborhood, zip_code)
 
     def get_address(self, **kwargs) -> Address:
         key = self._get_key(**kwargs)
+        shard = self._shards[hash(key) % len(self._shards)]
+        address_flyweight, reused = shard.get_or_create(key)
 
-        try:
-            address_flyweight = self._addresses[key]
-            print('usando objeto já criado')
-        except KeyError:
-            address_flyweight = Address(**kwargs)
-            self._addresses[key] = address_flyweight
-            print('criando novo objeto')
+        if reused:
+            self._log('usando objeto já criado')
+        else:
+            self._log('criando novo objeto')
 
         return address_flyweight
 
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+    @property
+    def hits(self) -> int:
+        return sum(shard.hits for shard in self._shards)
+
+    @property
+    def misses(self) -> int:
+        return sum(shard.misses for shard in self._shards)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    @property
+    def bytes_saved(self) -> int:
+        # estimativa: cada acerto é um Address que não precisou ser criado
+        return self.hits * ADDRESS_SIZE
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'pool_size': len(self),
+            'bytes_saved': self.bytes_saved,
+        }
+
+    def __len__(self) -> int:
+        return sum(len(shard.addresses) for shard in self._shards)
+
 
 if __name__ == '__main__':
     addres_fac = AddressFactory()
@@ -102,3 +240,20 @@ if __name__ == '__main__':
     a3.address_number = '50'
     a3.add_address(a1)
     a3.list_addresses()
+
+    # pool com referências fracas: o flyweight é liberado quando
+    # nenhum cliente o referencia mais
+    weak_fac = AddressFactory(weak=True, capacity=1000, verbose=False)
+    a4 = weak_fac.get_address(
+        street='Rua A', neighborhood='B', zip_code='0000000-00')
+    weak_fac.get_address(
+        street='Rua', neighborhood=' AB', zip_code='0000000-00')
+    print(len(weak_fac))  # 1, só a4 continua em uso
+
+    # várias threads: ainda um único flyweight por endereço
+    threaded_fac = AddressFactory(verbose=False)
+    with ThreadPoolExecutor(8) as executor:
+        executor.map(lambda i: threaded_fac.get_address(
+            street=f'Rua {i % 100}', neighborhood='centro',
+            zip_code='0000000-00'), range(10000))
+    print(threaded_fac.stats())
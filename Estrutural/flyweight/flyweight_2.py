@@ -0,0 +1,188 @@
+"""
+Flyweight em formato colunar.
+
+Mesmo com flyweights (flyweight_1.py), cada Client ainda é um objeto
+Python com uma lista de Address e duas strings próprias. Com milhões
+de clientes, esses objetos pequenos custam muito mais memória do que
+os dados em si.
+
+Aqui os dados ficam em colunas:
+- rua, bairro e CEP são guardados uma única vez em dicionários
+(StringPool) e referenciados por um id inteiro;
+- cada endereço (estado intrínseco) é uma linha de três ids;
+- as ligações cliente -> endereço e o estado extrínseco
+(address_number, address_detail) ficam em arrays de inteiros
+paralelos, um item por cliente ou por ligação;
+- os nomes (quase sempre únicos) ficam num único bytearray em UTF-8,
+com um array de offsets.
+
+Os objetos Address e Client deixam de existir: o cliente passa a ser
+apenas um índice nas colunas.
+"""
+from __future__ import annotations
+
+import csv
+import sys
+from array import array
+from typing import Dict, Iterator, List, TextIO, Tuple
+
+AddressRow = Tuple[str, str, str, str, str]
+
+
+class StringPool:
+    # dicionário de strings: cada valor distinto é guardado uma vez
+    def __init__(self) -> None:
+        self._values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        try:
+            return self._ids[value]
+        except KeyError:
+            value_id = self._ids[value] = len(self._values)
+            self._values.append(sys.intern(value))
+            return value_id
+
+    def __getitem__(self, value_id: int) -> str:
+        return self._values[value_id]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class AddressStore:
+    def __init__(self) -> None:
+        self.strings = StringPool()
+
+        # endereços (intrínseco): uma linha por endereço distinto
+        self._address_ids: Dict[Tuple[int, int, int], int] = {}
+        self._streets = array('I')
+        self._neighborhoods = array('I')
+        self._zip_codes = array('I')
+
+        # clientes (extrínseco): uma linha por cliente
+        self._names = bytearray()
+        self._name_offsets = array('Q', [0])
+        self._address_numbers = array('I')
+        self._address_details = array('I')
+        self._first_link = array('i')
+        self._last_link = array('i')
+
+        # ligações cliente -> endereço: lista encadeada em arrays
+        self._link_addresses = array('I')
+        self._next_link = array('i')
+
+    def add_client(
+        self, name: str, address_number: str, address_detail: str
+    ) -> int:
+        client_id = len(self._name_offsets) - 1
+        self._names += name.encode()
+        self._name_offsets.append(len(self._names))
+        self._address_numbers.append(self.strings.add(address_number))
+        self._address_details.append(self.strings.add(address_detail))
+        self._first_link.append(-1)
+        self._last_link.append(-1)
+        return client_id
+
+    def get_address(
+        self, street: str, neighborhood: str, zip_code: str
+    ) -> int:
+        key = (
+            self.strings.add(street),
+            self.strings.add(neighborhood),
+            self.strings.add(zip_code),
+        )
+
+        try:
+            return self._address_ids[key]
+        except KeyError:
+            address_id = self._address_ids[key] = len(self._streets)
+            self._streets.append(key[0])
+            self._neighborhoods.append(key[1])
+            self._zip_codes.append(key[2])
+            return address_id
+
+    def add_address(self, client_id: int, address_id: int) -> None:
+        link_id = len(self._link_addresses)
+        self._link_addresses.append(address_id)
+        self._next_link.append(-1)
+
+        last_link = self._last_link[client_id]
+
+        if last_link == -1:
+            self._first_link[client_id] = link_id
+        else:
+            self._next_link[last_link] = link_id
+
+        self._last_link[client_id] = link_id
+
+    def iter_addresses(self, client_id: int) -> Iterator[AddressRow]:
+        strings = self.strings
+        address_number = strings[self._address_numbers[client_id]]
+        address_detail = strings[self._address_details[client_id]]
+        link_id = self._first_link[client_id]
+
+        while link_id != -1:
+            address_id = self._link_addresses[link_id]
+            yield (
+                strings[self._streets[address_id]],
+                address_number,
+                strings[self._neighborhoods[address_id]],
+                address_detail,
+                strings[self._zip_codes[address_id]],
+            )
+            link_id = self._next_link[link_id]
+
+    def list_addresses(self, client_id: int) -> None:
+        for address in self.iter_addresses(client_id):
+            print(*address)
+
+    def client_name(self, client_id: int) -> str:
+        start, end = self._name_offsets[client_id:client_id + 2]
+        return self._names[start:end].decode()
+
+    def load_csv(self, file: TextIO) -> int:
+        # colunas: name, address_number, address_detail,
+        # street, neighborhood, zip_code
+        # linhas seguidas com o mesmo cliente viram vários endereços
+        loaded = 0
+        client_id = -1
+        client: Tuple[str, str, str] = ('', '', '')
+
+        for row in csv.DictReader(file):
+            row_client = (
+                row['name'], row['address_number'], row['address_detail'])
+
+            if row_client != client:
+                client = row_client
+                client_id = self.add_client(*client)
+                loaded += 1
+
+            self.add_address(client_id, self.get_address(
+                row['street'], row['neighborhood'], row['zip_code']))
+
+        return loaded
+
+    @property
+    def clients(self) -> int:
+        return len(self._name_offsets) - 1
+
+    @property
+    def addresses(self) -> int:
+        return len(self._streets)
+
+    def __len__(self) -> int:
+        return self.clients
+
+
+if __name__ == '__main__':
+    store = AddressStore()
+
+    client = store.add_client('name', '50', 'casa')
+    store.add_address(client, store.get_address(
+        street='Rua Tal', neighborhood='centro', zip_code='0000000-00'))
+    store.add_address(client, store.get_address(
+        street='Rua Tal', neighborhood='centro', zip_code='0000000-00'))
+    store.list_addresses(client)
+
+    print(store.client_name(client), store.clients, store.addresses)
@@ -0,0 +1,153 @@
+"""
+Benchmarks das variações do padrão Proxy.
+
+Uso:
+    python benchmark.py            # roda todos
+    python benchmark.py async      # roda apenas um deles
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from proxy_1 import (FixedLatency, HedgingPolicy, RandomLatency, RealUser,
+                     UserProxy)
+from proxy_2 import AsyncUserProxy
+from proxy_3 import BatchedUserProxy
+from proxy_4 import DiskUserCache, PersistentUserProxy
+
+
+def bench_async() -> None:
+    # carregamento frio: sync (proxy_1.py) x async (proxy_2.py)
+    RealUser.latency = FixedLatency(2)
+    UserProxy.cache.clear()
+
+    start = perf_counter()
+    person = UserProxy('person', 'one')
+    person.get_addresses()
+    person.get_all_user_data()
+    sync_time = perf_counter() - start
+
+    async def load() -> None:
+        await AsyncUserProxy('person', 'one').load()
+
+    start = perf_counter()
+    asyncio.run(load())
+    async_time = perf_counter() - start
+
+    print(f'UserProxy (sync):       {sync_time:.2f}s')
+    print(f'AsyncUserProxy (async): {async_time:.2f}s')
+
+
+def bench_batching(users: int = 200, latency: float = 0.01) -> None:
+    # uma página com `users` usuários: um proxy por usuário x batching
+    RealUser.latency = FixedLatency(latency)
+    UserProxy.cache.clear()
+
+    start = perf_counter()
+    for i in range(users):
+        UserProxy('page', str(i)).get_addresses()
+    serial_time = perf_counter() - start
+
+    UserProxy.cache.clear()
+    BatchedUserProxy.loader.batches = 0
+    people = [BatchedUserProxy('page', str(i)) for i in range(users)]
+
+    start = perf_counter()
+    with ThreadPoolExecutor(users) as executor:
+        list(executor.map(BatchedUserProxy.get_addresses, people))
+    batched_time = perf_counter() - start
+
+    print(f'latência simulada: {latency * 1000:.0f}ms, usuários: {users}')
+    print(f'UserProxy (um a um):     {serial_time:.3f}s')
+    print(f'BatchedUserProxy:        {batched_time:.3f}s '
+          f'({BatchedUserProxy.loader.batches} requisições)')
+
+
+def bench_disk_cache(users: int = 100, latency: float = 0.01) -> None:
+    # startup frio (só RealUser) x startup com o cache em disco aquecido
+    RealUser.latency = FixedLatency(latency)
+
+    def load_all() -> None:
+        for i in range(users):
+            person = PersistentUserProxy('disk', str(i))
+            person.get_addresses()
+            person.get_all_user_data()
+
+    with tempfile.TemporaryDirectory() as directory:
+        disk_cache = DiskUserCache(os.path.join(directory, 'cache.sqlite3'))
+        PersistentUserProxy.disk_cache = disk_cache
+        UserProxy.cache.clear()
+
+        start = perf_counter()
+        load_all()
+        cold_time = perf_counter() - start
+
+        # simulando o restart: a memória é perdida, o disco não
+        UserProxy.cache.clear()
+
+        start = perf_counter()
+        loaded = PersistentUserProxy.warm_up()
+        warm_up_time = perf_counter() - start
+        load_all()
+        warm_time = perf_counter() - start
+
+        PersistentUserProxy.disk_cache = None
+        disk_cache.close()
+
+    print(f'latência simulada: {latency * 1000:.0f}ms, usuários: {users}')
+    print(f'startup frio:            {cold_time:.3f}s')
+    print(f'startup com disco:       {warm_time:.3f}s '
+          f'(warm_up de {loaded} entradas em {warm_up_time * 1000:.1f}ms)')
+
+
+def bench_hedging(users: int = 150, threshold: float = 0.1) -> None:
+    # latência aleatória com cauda lenta: sem hedging x com hedging
+    def run(hedging: HedgingPolicy) -> List[float]:
+        RealUser.latency = RandomLatency(
+            seconds=0.02, tail_seconds=1, tail_probability=0.05, seed=42)
+        UserProxy.cache.clear()
+        times = []
+
+        for i in range(users):
+            start = perf_counter()
+            UserProxy('hedge', str(i), hedging).get_addresses()
+            times.append(perf_counter() - start)
+
+        return sorted(times)
+
+    def percentile(times: List[float], p: float) -> str:
+        return f'{times[int(p * (len(times) - 1))] * 1000:.0f}ms'
+
+    policy = HedgingPolicy(threshold)
+
+    for name, times in (
+        ('sem hedging', run(HedgingPolicy())),
+        (f'hedging ({threshold * 1000:.0f}ms)', run(policy)),
+    ):
+        print(f'{name:<20} p50={percentile(times, 0.5)} '
+              f'p99={percentile(times, 0.99)} '
+              f'total={sum(times):.2f}s')
+
+    print(f'requisições duplicadas: {policy.hedges}')
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    'async': bench_async,
+    'batching': bench_batching,
+    'disk_cache': bench_disk_cache,
+    'hedging': bench_hedging,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f'--- {name} ---')
+        BENCHMARKS[name]()
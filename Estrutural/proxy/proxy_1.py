@@ -28,8 +28,14 @@ e muito mais...
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from time import sleep
-from typing import Dict, List
+from collections import OrderedDict
+from copy import deepcopy
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from random import Random
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 
 class IUser(ABC):
@@ -44,56 +50,340 @@ class IUser(ABC):
     def get_all_user_data(self) -> Dict: pass
 
 
+class LatencyModel(ABC):
+    # simula o tempo de resposta do servidor
+    @abstractmethod
+    def wait(self) -> None: pass
+
+
+class FixedLatency(LatencyModel):
+    def __init__(self, seconds: float = 2) -> None:
+        self.seconds = seconds
+
+    def wait(self) -> None:
+        sleep(self.seconds)
+
+
+class RandomLatency(LatencyModel):
+    # a maioria das respostas é rápida, mas algumas caem na cauda lenta
+    def __init__(
+        self,
+        seconds: float = 0.05,
+        tail_seconds: float = 1,
+        tail_probability: float = 0.05,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.seconds = seconds
+        self.tail_seconds = tail_seconds
+        self.tail_probability = tail_probability
+        self._random = Random(seed)
+
+    def wait(self) -> None:
+        if self._random.random() < self.tail_probability:
+            sleep(self.tail_seconds)
+        else:
+            sleep(self._random.uniform(0.5, 1.5) * self.seconds)
+
+
+UserKey = Tuple[str, str]
+
+
 class RealUser(IUser):
     # real subject
+    latency: LatencyModel = FixedLatency(2)
+
     def __init__(self, firstname: str, lastname: str) -> None:
-        sleep(2)  # simulando requisição
+        self.latency.wait()  # simulando requisição
         self.firstname = firstname
         self.lastname = lastname
 
     def get_addresses(self) -> List[Dict]:
-        sleep(2)  # simulando requisição
+        self.latency.wait()  # simulando requisição
         return [
             {'rua': 'teste', 'numero': '420'}
         ]
 
     def get_all_user_data(self) -> Dict:
-        sleep(2)  # simulando requisição
+        self.latency.wait()  # simulando requisição
         return {'cpf': '111.111.111-11', 'rg': 'AB222333444'}
 
+    @classmethod
+    def get_addresses_many(
+        cls, keys: List[UserKey]
+    ) -> Dict[UserKey, List[Dict]]:
+        cls.latency.wait()  # uma única requisição para todos os usuários
+        return {
+            key: [{'rua': 'teste', 'numero': '420'}] for key in keys
+        }
+
+
+class UserCache:
+    # cache compartilhado por todos os proxies do processo. Guarda uma
+    # cópia do valor e devolve uma cópia a cada leitura: um proxy que
+    # altera a lista recebida não altera o que os outros vão receber
+    def __init__(
+        self, ttl: Optional[float] = 300, max_entries: int = 1024
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = \
+            OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            try:
+                expires_at, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                raise
+
+            if expires_at < monotonic():
+                del self._entries[key]
+                self.misses += 1
+                raise KeyError(key)
+
+            # LRU: o item usado vai para o final da fila
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return deepcopy(value)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = float('inf') if self.ttl is None \
+            else monotonic() + self.ttl
+
+        value = deepcopy(value)
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+
+    return max(0, deadline - monotonic())
+
+
+def deadline_after(timeout: Optional[float]) -> Optional[float]:
+    return None if timeout is None else monotonic() + timeout
+
+
+class _Call:
+    # requisição em andamento
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    # chamadas concorrentes com a mesma chave esperam a mesma requisição.
+    # A requisição roda numa thread própria e sem prazo: cada chamada
+    # respeita apenas o seu prazo enquanto espera, e o prazo curto de uma
+    # delas não faz as outras falharem
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = Lock()
+
+    def do(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Any],
+        deadline: Optional[float] = None,
+    ) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = _Call()
+
+        assert call is not None
+
+        if leader:
+            Thread(target=self._run, args=(key, call, fetch),
+                   daemon=True).start()
+
+        if not call.done.wait(time_left(deadline)):
+            raise TimeoutError('o prazo da requisição expirou')
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result
+
+    def _run(
+        self, key: Hashable, call: _Call, fetch: Callable[[], Any]
+    ) -> None:
+        try:
+            call.result = fetch()
+        except BaseException as error:
+            call.error = error
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class HedgingPolicy:
+    # se a requisição não responder em `threshold` segundos, uma segunda
+    # requisição idêntica é disparada e vale a que responder primeiro
+    def __init__(
+        self, threshold: Optional[float] = None, max_workers: int = 32
+    ) -> None:
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.hedges = 0
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def _submit(self, request: Callable[[], Any]) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers)
+
+        return self._executor.submit(request)
+
+    def call(
+        self, request: Callable[[], Any], deadline: Optional[float] = None
+    ) -> Any:
+        if self.threshold is None and deadline is None:
+            return request()
+
+        pending = {self._submit(request)}
+
+        if self.threshold is not None:
+            first_wait = self.threshold if deadline is None \
+                else min(self.threshold, time_left(deadline) or 0)
+            done, pending = wait(pending, first_wait)
+
+            if done:
+                return done.pop().result()
+
+            if deadline is None or monotonic() < deadline:
+                pending.add(self._submit(request))
+                self.hedges += 1
+
+        error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = wait(
+                pending, time_left(deadline), return_when=FIRST_COMPLETED)
+
+            if not done:
+                break
+
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+
+        raise TimeoutError('o prazo da requisição expirou')
+
 
 class UserProxy(IUser):
     # Proxy
-    def __init__(self, firstname: str, lastname: str) -> None:
+    cache = UserCache()
+    flight = SingleFlight()
+    hedging = HedgingPolicy()
+
+    def __init__(
+        self,
+        firstname: str,
+        lastname: str,
+        hedging: Optional[HedgingPolicy] = None,
+    ) -> None:
         self.firstname = firstname
         self.lastname = lastname
 
-        # esses objetos ainda não existem nesse ponto do código
+        if hedging is not None:
+            self.hedging = hedging
+
+        # esse objeto ainda não existe nesse ponto do código
         self._real_user: RealUser
-        self._cached_addresses: List[Dict]
-        self._all_user_data: Dict
+        self._lock = Lock()
 
      # lazy instanciation
 
     def get_real_user(self) -> None:
-        if not hasattr(self, '_real_user'):
-            self._real_user = RealUser(self.firstname, self.lastname)
+        # só é chamado dentro da requisição compartilhada (flight.do), que
+        # roda sem prazo: o prazo de cada chamada vale na espera do flight
+        with self._lock:
+            if not hasattr(self, '_real_user'):
+                self._real_user = self.hedging.call(
+                    lambda: RealUser(self.firstname, self.lastname))
 
-    def get_addresses(self) -> List[Dict]:
-        self.get_real_user()
+    def _cached(
+        self,
+        kind: str,
+        fetch: Callable[[], Any],
+        deadline: Optional[float] = None,
+    ) -> Any:
+        # a chave é a identidade do usuário, não o objeto proxy
+        key = (self.firstname, self.lastname, kind)
 
-        if not hasattr(self, '_cached_addresses'):
-            self._cached_addresses = self._real_user.get_addresses()
+        try:
+            return self.cache.get(key)
+        except KeyError:
+            pass
 
-        return self._cached_addresses
+        def load() -> Any:
+            # outro líder pode ter terminado entre o get acima e o do
+            try:
+                return self.cache.get(key)
+            except KeyError:
+                pass
 
-    def get_all_user_data(self) -> Dict:
-        self.get_real_user()
+            value = fetch()
+            self.cache.set(key, value)
+            return value
+
+        # o resultado da requisição é o mesmo objeto para todas as
+        # chamadas que a esperaram: cada uma recebe a sua cópia
+        return deepcopy(self.flight.do(key, load, deadline))
+
+    def get_addresses(self, timeout: Optional[float] = None) -> List[Dict]:
+        deadline = deadline_after(timeout)
+
+        # a requisição compartilhada roda sem prazo; o prazo desta
+        # chamada vale só para a espera em flight.do
+        def fetch() -> List[Dict]:
+            self.get_real_user()
+            return self.hedging.call(self._real_user.get_addresses)
+
+        return self._cached('addresses', fetch, deadline)
 
-        if not hasattr(self, '_all_user_data'):
-            self._all_user_data = self._real_user.get_all_user_data()
+    def get_all_user_data(self, timeout: Optional[float] = None) -> Dict:
+        deadline = deadline_after(timeout)
 
-        return self._all_user_data
+        def fetch() -> Dict:
+            self.get_real_user()
+            return self.hedging.call(self._real_user.get_all_user_data)
+
+        return self._cached('all_user_data', fetch, deadline)
 
 
 if __name__ == '__main__':
@@ -107,3 +397,22 @@ if __name__ == '__main__':
     print('cached data')
     for i in range(50):
         print(person.get_addresses())
+
+    # outro proxy para o mesmo usuário também usa o cache
+    same_person = UserProxy('person', 'one')
+    print(same_person.get_addresses())
+    print(f'hits={UserProxy.cache.hits} misses={UserProxy.cache.misses}')
+
+    # 10 threads pedindo o mesmo usuário frio: uma única requisição
+    cold_person = UserProxy('person', 'two')
+    with ThreadPoolExecutor(10) as executor:
+        for addresses in executor.map(
+            lambda _: cold_person.get_addresses(), range(10)
+        ):
+            print(addresses)
+
+    # prazo por chamada: falha rápido em vez de esperar 4 segundos
+    try:
+        UserProxy('person', 'three').get_addresses(timeout=0.5)
+    except TimeoutError as error:
+        print(f'timeout: {error}')
@@ -0,0 +1,126 @@
+"""
+Proxy assíncrono.
+
+Mesma ideia do proxy_1.py (Proxy Virtual com cache), mas usando
+asyncio. Como as três requisições do objeto real (criação, endereços
+e dados do usuário) só dependem do nome do usuário, o proxy pode
+disparar todas ao mesmo tempo e aguardá-las juntas com
+asyncio.gather. Assim, um carregamento "frio" custa o tempo de uma
+requisição em vez de três.
+"""
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+class IAsyncUser(ABC):
+    # subject interface
+    firstname: str
+    lastname: str
+
+    @abstractmethod
+    async def get_addresses(self) -> List[Dict]: pass
+
+    @abstractmethod
+    async def get_all_user_data(self) -> Dict: pass
+
+
+class AsyncRealUser(IAsyncUser):
+    # real subject
+    def __init__(
+        self, firstname: str, lastname: str, latency: float = 2
+    ) -> None:
+        self.firstname = firstname
+        self.lastname = lastname
+        self.latency = latency
+
+    async def connect(self) -> None:
+        await asyncio.sleep(self.latency)  # simulando requisição
+
+    async def get_addresses(self) -> List[Dict]:
+        await asyncio.sleep(self.latency)  # simulando requisição
+        return [
+            {'rua': 'teste', 'numero': '420'}
+        ]
+
+    async def get_all_user_data(self) -> Dict:
+        await asyncio.sleep(self.latency)  # simulando requisição
+        return {'cpf': '111.111.111-11', 'rg': 'AB222333444'}
+
+
+class AsyncUserProxy(IAsyncUser):
+    # Proxy
+    def __init__(
+        self, firstname: str, lastname: str, latency: float = 2
+    ) -> None:
+        self.firstname = firstname
+        self.lastname = lastname
+        self.latency = latency
+
+        # as tasks são criadas sob demanda e guardadas, então
+        # chamadas concorrentes aguardam a mesma requisição
+        self._real_user: Optional[AsyncRealUser] = None
+        self._connect_task: Optional[asyncio.Task] = None
+        self._addresses_task: Optional[asyncio.Task] = None
+        self._all_user_data_task: Optional[asyncio.Task] = None
+
+    # lazy instanciation
+
+    def get_real_user(self) -> AsyncRealUser:
+        if self._real_user is None:
+            self._real_user = AsyncRealUser(
+                self.firstname, self.lastname, self.latency)
+            self._connect_task = asyncio.ensure_future(
+                self._real_user.connect())
+
+        return self._real_user
+
+    async def connect(self) -> None:
+        self.get_real_user()
+        assert self._connect_task is not None
+        await self._connect_task
+
+    async def get_addresses(self) -> List[Dict]:
+        real_user = self.get_real_user()
+
+        if self._addresses_task is None:
+            self._addresses_task = asyncio.ensure_future(
+                real_user.get_addresses())
+
+        await self.connect()
+        return await self._addresses_task
+
+    async def get_all_user_data(self) -> Dict:
+        real_user = self.get_real_user()
+
+        if self._all_user_data_task is None:
+            self._all_user_data_task = asyncio.ensure_future(
+                real_user.get_all_user_data())
+
+        await self.connect()
+        return await self._all_user_data_task
+
+    async def load(self) -> None:
+        # dispara criação, endereços e dados de uma vez só
+        await asyncio.gather(
+            self.connect(), self.get_addresses(), self.get_all_user_data()
+        )
+
+
+if __name__ == '__main__':
+    async def main() -> None:
+        person = AsyncUserProxy('person', 'one')
+
+        # 2 segundos (no proxy_1.py são 6)
+        print(await asyncio.gather(
+            person.get_all_user_data(), person.get_addresses()
+        ))
+
+        # responde instantaneamente
+        print('cached data')
+        for i in range(50):
+            print(await person.get_addresses())
+
+    asyncio.run(main())
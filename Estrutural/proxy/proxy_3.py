@@ -0,0 +1,148 @@
+"""
+Proxy com agrupamento de requisições (batching), no estilo DataLoader.
+
+Em vez de cada UserProxy fazer a sua própria requisição ao RealUser,
+as chaves pedidas dentro de uma pequena janela de tempo são juntadas
+e enviadas numa única chamada a RealUser.get_addresses_many. O
+resultado é então distribuído de volta para cada proxy.
+
+Renderizar uma página com 200 usuários passa a custar uma requisição
+em vez de 200.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future
+from threading import Lock, Thread, Timer
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from proxy_1 import RealUser, UserKey, UserProxy, deadline_after
+
+
+class BatchLoader:
+    def __init__(
+        self,
+        batch_fetch: Callable[[List[Any]], Dict[Any, Any]],
+        window: float = 0.005,
+        max_batch_size: int = 1000,
+    ) -> None:
+        self.batch_fetch = batch_fetch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+
+        self._pending: Dict[Hashable, Future] = {}
+        self._timer: Optional[Timer] = None
+        self._lock = Lock()
+
+    def submit(self, key: Hashable) -> Future:
+        with self._lock:
+            # a mesma chave na mesma janela vira um único pedido
+            future = self._pending.get(key)
+
+            if future is None:
+                future = self._pending[key] = Future()
+
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._take_batch()
+                Thread(target=self._dispatch, args=(batch,)).start()
+            elif self._timer is None:
+                self._timer = Timer(self.window, self._dispatch_pending)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return future
+
+    def load(self, key: Hashable) -> Any:
+        return self.submit(key).result()
+
+    def load_many(self, keys: List[Hashable]) -> List[Any]:
+        futures = [self.submit(key) for key in keys]
+        return [future.result() for future in futures]
+
+    def _take_batch(self) -> Dict[Hashable, Future]:
+        # precisa ser chamado com o lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        return batch
+
+    def _dispatch_pending(self) -> None:
+        with self._lock:
+            batch = self._take_batch()
+
+        self._dispatch(batch)
+
+    def _dispatch(self, batch: Dict[Hashable, Future]) -> None:
+        if not batch:
+            return
+
+        self.batches += 1
+
+        try:
+            results = self.batch_fetch(list(batch))
+        except BaseException as error:
+            for future in batch.values():
+                future.set_exception(error)
+            return
+
+        for key, future in batch.items():
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(key))
+
+
+class BatchedUserProxy(UserProxy):
+    # Proxy
+    loader = BatchLoader(RealUser.get_addresses_many)
+
+    @property
+    def key(self) -> UserKey:
+        return (self.firstname, self.lastname)
+
+    def get_addresses(self, timeout: Optional[float] = None) -> List[Dict]:
+        deadline = deadline_after(timeout)
+
+        # como em UserProxy: a requisição compartilhada espera o lote sem
+        # prazo; o prazo desta chamada vale só em _cached
+        def fetch() -> List[Dict]:
+            return self.loader.load(self.key)
+
+        return self._cached('addresses', fetch, deadline)
+
+    @classmethod
+    def get_addresses_many(
+        cls, proxies: List[BatchedUserProxy]
+    ) -> List[List[Dict]]:
+        # uso numa única thread: pede tudo antes de esperar. Só as chaves
+        # que não estão no cache vão para o lote
+        results: List[Optional[List[Dict]]] = []
+        futures: Dict[int, Future] = {}
+
+        for position, proxy in enumerate(proxies):
+            try:
+                results.append(cls.cache.get((*proxy.key, 'addresses')))
+            except KeyError:
+                results.append(None)
+                futures[position] = cls.loader.submit(proxy.key)
+
+        for position, future in futures.items():
+            results[position] = proxies[position]._cached(
+                'addresses', future.result)
+
+        return results  # type: ignore
+
+
+if __name__ == '__main__':
+    people = [BatchedUserProxy('person', str(i)) for i in range(200)]
+
+    # 2 segundos para os 200 usuários
+    addresses = BatchedUserProxy.get_addresses_many(people)
+    print(len(addresses), addresses[0])
+    print(f'requisições: {BatchedUserProxy.loader.batches}')
+
+    # todos já estão no cache: nenhum lote novo
+    BatchedUserProxy.get_addresses_many(people)
+    print(f'requisições: {BatchedUserProxy.loader.batches}')
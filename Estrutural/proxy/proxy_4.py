@@ -0,0 +1,158 @@
+"""
+Proxy com um segundo nível de cache persistido em disco (sqlite3).
+
+O cache em memória do proxy_1.py se perde sempre que o processo
+reinicia. Aqui, os resultados de get_addresses e get_all_user_data
+também são gravados (em JSON, com data de expiração) num banco
+sqlite3. Ao subir o processo, warm_up carrega de uma vez só as
+entradas ainda válidas do disco para a memória, e nenhum RealUser
+precisa ser criado para os usuários já conhecidos.
+
+Ordem de consulta: memória -> disco -> RealUser.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from proxy_1 import UserCache, UserKey, UserProxy
+
+CacheKey = Tuple[str, str, str]
+
+
+class DiskUserCache:
+    def __init__(
+        self, path: str = 'user_cache.sqlite3', ttl: Optional[float] = 86400
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS user_cache ('
+            ' firstname TEXT, lastname TEXT, kind TEXT,'
+            ' value TEXT, expires_at REAL,'
+            ' PRIMARY KEY (firstname, lastname, kind))'
+        )
+        self._connection.commit()
+        self._lock = Lock()
+
+    def _expires_at(self) -> float:
+        # relógio de parede, pois a validade precisa sobreviver ao restart
+        return float('inf') if self.ttl is None else time() + self.ttl
+
+    def get(self, key: CacheKey) -> Any:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM user_cache WHERE firstname = ?'
+                ' AND lastname = ? AND kind = ? AND expires_at > ?',
+                (*key, time())
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(key)
+
+        return json.loads(row[0])
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[CacheKey, Any]]) -> None:
+        expires_at = self._expires_at()
+
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO user_cache VALUES (?, ?, ?, ?, ?)',
+                [
+                    (*key, json.dumps(value), expires_at)
+                    for key, value in items
+                ]
+            )
+            self._connection.commit()
+
+    def warm_up(
+        self, cache: UserCache, users: Optional[List[UserKey]] = None
+    ) -> int:
+        # carrega as entradas válidas do disco para o cache em memória
+        query = 'SELECT firstname, lastname, kind, value FROM user_cache' \
+            ' WHERE expires_at > ?'
+
+        with self._lock:
+            rows = self._connection.execute(query, (time(),)).fetchall()
+
+        wanted = None if users is None else set(users)
+        loaded = 0
+
+        for firstname, lastname, kind, value in rows:
+            if wanted is not None and (firstname, lastname) not in wanted:
+                continue
+
+            cache.set((firstname, lastname, kind), json.loads(value))
+            loaded += 1
+
+        return loaded
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM user_cache WHERE expires_at <= ?', (time(),))
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM user_cache')
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class PersistentUserProxy(UserProxy):
+    # Proxy
+    disk_cache: Optional[DiskUserCache] = None
+
+    def _cached(
+        self,
+        kind: str,
+        fetch: Callable[[], Any],
+        deadline: Optional[float] = None,
+    ) -> Any:
+        disk_cache = self.disk_cache
+
+        if disk_cache is None:
+            return super()._cached(kind, fetch, deadline)
+
+        key: CacheKey = (self.firstname, self.lastname, kind)
+
+        def fetch_from_disk() -> Any:
+            try:
+                return disk_cache.get(key)
+            except KeyError:
+                value = fetch()
+                disk_cache.set(key, value)
+                return value
+
+        return super()._cached(kind, fetch_from_disk, deadline)
+
+    @classmethod
+    def warm_up(cls, users: Optional[List[UserKey]] = None) -> int:
+        if cls.disk_cache is None:
+            return 0
+
+        return cls.disk_cache.warm_up(cls.cache, users)
+
+
+if __name__ == '__main__':
+    PersistentUserProxy.disk_cache = DiskUserCache()
+
+    # na primeira execução: 6 segundos
+    # nas seguintes (até expirar): instantâneo
+    print(f'carregados do disco: {PersistentUserProxy.warm_up()}')
+
+    person = PersistentUserProxy('person', 'one')
+    print(person.get_all_user_data())
+    print(person.get_addresses())